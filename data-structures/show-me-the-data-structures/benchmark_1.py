@@ -0,0 +1,443 @@
+"""
+Benchmarks for the LRU cache in problem_1.py.
+
+Run from this directory:
+
+    python benchmark_1.py                    # default sizes
+    python benchmark_1.py -n 200000          # operations per scenario
+    python benchmark_1.py --trace keys.txt   # also replay a recorded key stream
+"""
+import argparse
+import asyncio
+import functools
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+from problem_1 import (_DIRTY, POLICIES, ArrayLRUCache, AsyncLRUCache, LRU_Cache, LinkedList,
+                       MappedLRUCache, Node, ShardedLRUCache, SharedLRUCache, memoize)
+
+
+class BaselineLRUCache:
+    """
+    The original LRU_Cache algorithm, kept only as a point of comparison.
+
+    Every hit removes the node and prepends a freshly allocated one, and a
+    second dictionary maps nodes back to keys for eviction.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity: int = capacity
+        self.cache: dict[int, Node] = {}
+        self.revcache: dict[Node, int] = {}
+        self.data: LinkedList = LinkedList()
+
+    def get(self, key: int) -> int:
+        node = self.cache.get(key)
+        if node is None:
+            return -1
+        self.data.remove(node)
+        self.cache[key] = self.data.prepend(node.value)
+        self.revcache[self.cache[key]] = key
+        return node.value
+
+    def set(self, key: int, value: int) -> None:
+        if self.get(key) == -1:
+            if len(self.cache) >= self.capacity:
+                tail = self.data.tail
+                assert tail
+                self.data.remove(tail)
+                del self.cache[self.revcache.pop(tail)]
+            self.cache[key] = self.data.prepend(value)
+            self.revcache[self.cache[key]] = key
+        elif self.get(key) != value:
+            assert self.data.head
+            old = self.data.remove(self.data.head)
+            self.revcache.pop(old, None)
+            self.cache[key] = self.data.prepend(value)
+            self.revcache[self.cache[key]] = key
+
+
+def timed(fn: Callable[[], None]) -> float:
+    """Return the wall-clock seconds taken by a single call of fn."""
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_hits(cache_cls: Callable[[int], object], n: int) -> float:
+    """Ops/sec for get() on keys that are always resident."""
+    capacity = 1_000
+    cache = cache_cls(capacity)
+    for i in range(capacity):
+        cache.set(i, i)
+    keys = [random.randrange(capacity) for _ in range(n)]
+    get = cache.get
+
+    def run() -> None:
+        for k in keys:
+            get(k)
+    return n / timed(run)
+
+
+def bench_misses(cache_cls: Callable[[int], object], n: int) -> float:
+    """Ops/sec for get() on keys that are never resident."""
+    capacity = 1_000
+    cache = cache_cls(capacity)
+    for i in range(capacity):
+        cache.set(i, i)
+    keys = [capacity + random.randrange(n) for _ in range(n)]
+    get = cache.get
+
+    def run() -> None:
+        for k in keys:
+            get(k)
+    return n / timed(run)
+
+
+def bench_evictions(cache_cls: Callable[[int], object], n: int) -> float:
+    """Ops/sec for set() of new keys into a full cache, so every call evicts."""
+    capacity = 1_000
+    cache = cache_cls(capacity)
+    for i in range(capacity):
+        cache.set(i, i)
+    set_ = cache.set
+
+    def run() -> None:
+        for k in range(capacity, capacity + n):
+            set_(k, k)
+    return n / timed(run)
+
+
+SCENARIOS: dict[str, Callable[[Callable[[int], object], int], float]] = {
+    "hit": bench_hits,
+    "miss": bench_misses,
+    "eviction": bench_evictions,
+}
+
+
+def report(implementations: dict[str, Callable[[int], object]], n: int,
+           scenarios: Optional[dict[str, Callable[[Callable[[int], object], int], float]]] = None) -> None:
+    """Print ops/sec for every implementation and scenario, relative to the first one."""
+    scenarios = scenarios or SCENARIOS
+    names = list(implementations)
+    print(f"{'scenario':<10}" + "".join(f"{name:>22}" for name in names))
+    for scenario, bench in scenarios.items():
+        rates = [bench(implementations[name], n) for name in names]
+        cells = "".join(f"{rate:>14,.0f} ({rate / rates[0]:4.2f}x)" for rate in rates)
+        print(f"{scenario:<10}{cells}")
+
+
+def with_stats(timing: bool) -> Callable[[int], LRU_Cache]:
+    """Return a factory for LRU_Cache instances with statistics enabled."""
+    def make(capacity: int) -> LRU_Cache:
+        cache = LRU_Cache(capacity)
+        cache.enable_stats(timing)
+        return cache
+    return make
+
+
+class LockedLRUCache:
+    """A single LRU_Cache behind one global lock, the simplest thread-safe option."""
+
+    def __init__(self, capacity: int) -> None:
+        self.cache = LRU_Cache(capacity)
+        self.lock = threading.Lock()
+
+    def get(self, key: int) -> int:
+        with self.lock:
+            return self.cache.get(key)
+
+    def set(self, key: int, value: int) -> None:
+        with self.lock:
+            self.cache.set(key, value)
+
+
+def bench_threads(cache: object, threads: int, n: int) -> float:
+    """Aggregate ops/sec of `threads` threads sharing one cache, n ops in total, 80% reads."""
+    per_thread = n // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        ops = [(rng.randrange(20_000), rng.random() < 0.8) for _ in range(per_thread)]
+        get, set_ = cache.get, cache.set
+        barrier.wait()
+        for key, read in ops:
+            if read:
+                get(key)
+            else:
+                set_(key, key)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in pool:
+        t.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def bytes_per_entry(cache_cls: Callable[[int], object], entries: int) -> float:
+    """Traced allocation per entry of a cache filled to capacity with large int keys/values."""
+    tracemalloc.start()
+    cache = cache_cls(entries)
+    for i in range(entries):
+        cache.set(i + 2**40, i + 2**40)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used / entries
+
+
+def bench_herd(coalesce: bool, waiters: int, hot_keys: int) -> tuple[int, float]:
+    """Loader calls and seconds for `waiters` coroutines missing on `hot_keys` keys at once."""
+    calls = 0
+
+    async def loader(key: int) -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.001)
+        return key
+
+    async def naive_get(cache: LRU_Cache, key: int) -> int:
+        value = cache.get(key)
+        if value == -1:
+            value = await loader(key)
+            cache.set(key, value)
+        return value
+
+    async def run() -> None:
+        if coalesce:
+            cache = AsyncLRUCache(hot_keys, loader)
+            await asyncio.gather(*(cache.get(i % hot_keys) for i in range(waiters)))
+        else:
+            plain = LRU_Cache(hot_keys)
+            await asyncio.gather(*(naive_get(plain, i % hot_keys) for i in range(waiters)))
+
+    seconds = timed(lambda: asyncio.run(run()))
+    return calls, seconds
+
+
+def load_trace(path: str) -> list[int]:
+    """
+    Read a recorded key stream, whitespace separated.
+
+    Integer tokens are used as keys directly; any other token is mapped to a
+    small integer id, the same id for every occurrence of the token.
+    """
+    ids: dict[str, int] = {}
+    keys: list[int] = []
+    with open(path) as f:
+        for token in f.read().split():
+            try:
+                keys.append(int(token))
+            except ValueError:
+                keys.append(-1 - ids.setdefault(token, len(ids)))
+    return keys
+
+
+def synthetic_traces(n: int, seed: int = 0) -> dict[str, list[int]]:
+    """
+    Key streams with known shapes: a skewed (Zipf-like) stream, the same stream
+    interrupted by long scans of one-hit wonders, and a loop slightly larger than
+    the cache.
+    """
+    rng = random.Random(seed)
+    zipf = [int(100_000 ** rng.random()) for _ in range(n)]
+    scans = list(zipf)
+    scan_key = 1_000_000
+    for start in range(n // 10, n, n // 4):
+        for i in range(start, min(start + n // 10, n)):
+            scans[i] = scan_key
+            scan_key += 1
+    loop = [i % 1_200 for i in range(n)]
+    return {"zipf": zipf, "zipf+scans": scans, "loop": loop}
+
+
+def replay(cache_cls: Callable[[int], object], capacity: int, keys: list[int]) -> tuple[float, float]:
+    """
+    Replay a key stream as read-through traffic: get, and set on a miss.
+
+    Returns the hit ratio and the ops/sec of the whole replay.
+    """
+    cache = cache_cls(capacity)
+    get, set_ = cache.get, cache.set
+    hits = 0
+
+    def run() -> None:
+        nonlocal hits
+        for k in keys:
+            if get(k) == -1:
+                set_(k, 0)
+            else:
+                hits += 1
+    seconds = timed(run)
+    return hits / len(keys), len(keys) / seconds
+
+
+def report_policies(traces: dict[str, list[int]], capacity: int) -> None:
+    """Print hit ratio and ops/sec of every eviction policy on every trace."""
+    print(f"{'trace':<14}{'policy':<10}{'hit ratio':>10}{'ops/sec':>14}")
+    for trace, keys in traces.items():
+        for name, cls in POLICIES.items():
+            ratio, rate = replay(cls, capacity, keys)
+            print(f"{trace:<14}{name:<10}{ratio:>10.3f}{rate:>14,.0f}")
+
+
+def bench_memoize(decorator: Callable[[Callable], Callable], n: int, keywords: bool) -> tuple[float, float]:
+    """Calls/sec and hit ratio of a memoized function over skewed arguments, cache of 1,000."""
+    rng = random.Random(1)
+    args = [(int(10_000 ** rng.random()), rng.randrange(3)) for _ in range(n)]
+
+    @decorator
+    def area(width: int, height: int = 1) -> int:
+        return width * height
+
+    if keywords:
+        def run() -> None:
+            for w, h in args:
+                area(w, height=h)
+    else:
+        def run() -> None:
+            for w, h in args:
+                area(w, h)
+    rate = n / timed(run)
+    info = area.cache_info()
+    hits = info["hits"] if isinstance(info, dict) else info.hits
+    return rate, hits / n
+
+
+def bench_startup(entries: int) -> None:
+    """Print the time to get a cache of `entries` warm: refilled, reopened, or recovered."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.bin")
+
+        def refill() -> None:
+            cold = LRU_Cache(entries)
+            for i in range(entries):
+                cold.set(i, i)
+        print(f"{'refill LRU_Cache':<28}{timed(refill):>10.4f}")
+
+        cache = MappedLRUCache(path, entries)
+        for i in range(entries):
+            cache.set(i, i)
+        cache.close()
+
+        def reopen() -> None:
+            reopened = MappedLRUCache(path)
+            assert reopened.get(entries - 1) == entries - 1
+            reopened.close()
+        print(f"{'reopen MappedLRUCache':<28}{timed(reopen):>10.4f}")
+
+        crashed = MappedLRUCache(path)
+        crashed._meta[_DIRTY] = 1
+        crashed.close()
+        print(f"{'recover after a crash':<28}{timed(reopen):>10.4f}")
+
+
+def process_worker(cache: Optional[object], capacity: int, seed: int, n: int,
+                   results: "multiprocessing.Queue[tuple[int, float]]") -> None:
+    """Read-through traffic from one worker process; a private cache if none is shared."""
+    if cache is None:
+        cache = ArrayLRUCache(capacity)
+    rng = random.Random(seed)
+    keys = [int(100_000 ** rng.random()) for _ in range(n)]
+    get, set_ = cache.get, cache.set
+    hits = 0
+    start = time.perf_counter()
+    for k in keys:
+        if get(k) == -1:
+            set_(k, k)
+        else:
+            hits += 1
+    results.put((hits, time.perf_counter() - start))
+
+
+def bench_processes(workers: int, n: int, capacity: int, shared: bool) -> tuple[float, float]:
+    """Aggregate ops/sec and hit ratio of forked workers, n ops each."""
+    fork = multiprocessing.get_context("fork")
+    results = fork.Queue()
+    cache = SharedLRUCache(capacity) if shared else None
+    pool = [fork.Process(target=process_worker, args=(cache, capacity, seed, n, results))
+            for seed in range(workers)]
+    for p in pool:
+        p.start()
+    outcomes = [results.get() for _ in pool]
+    for p in pool:
+        p.join()
+    if cache is not None:
+        cache.close()
+        cache.unlink()
+    hits = sum(h for h, _ in outcomes)
+    slowest = max(t for _, t in outcomes)
+    return workers * n / slowest, hits / (workers * n)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=200_000, help="operations per scenario")
+    parser.add_argument("--entries", type=int, default=100_000, help="cache size for the memory report")
+    parser.add_argument("--capacity", type=int, default=1_000, help="cache size for the trace replay")
+    parser.add_argument("--trace", action="append", default=[], help="file of recorded keys to replay")
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"LRU cache throughput, {args.n:,} ops per scenario (ops/sec)")
+    report({"baseline": BaselineLRUCache, "LRU_Cache": LRU_Cache, "ArrayLRUCache": ArrayLRUCache}, args.n)
+
+    print(f"\nStatistics overhead, {args.n:,} ops per scenario (ops/sec)")
+    report({"disabled": LRU_Cache, "counters": with_stats(False), "timing": with_stats(True)}, args.n)
+
+    print(f"\nMemoized calls, {args.n:,} calls over skewed arguments (calls/sec, hit ratio)")
+    print(f"{'call style':<12}{'functools.lru_cache':>26}{'memoize':>26}")
+    for style, keywords in (("positional", False), ("keywords", True)):
+        cells = ""
+        for decorator in (functools.lru_cache(maxsize=1_000), memoize(maxsize=1_000)):
+            rate, ratio = bench_memoize(decorator, args.n, keywords)
+            cells += f"{rate:>18,.0f} ({ratio:.2f})"
+        print(f"{style:<12}{cells}")
+
+    print(f"\nShared cache throughput by thread count, {args.n:,} ops in total (ops/sec)")
+    print(f"{'threads':<10}{'one lock':>14}{'16 shards':>14}")
+    for threads in (1, 4, 8, 16):
+        locked = bench_threads(LockedLRUCache(10_000), threads, args.n)
+        sharded = bench_threads(ShardedLRUCache(10_000, num_shards=16), threads, args.n)
+        print(f"{threads:<10}{locked:>14,.0f}{sharded:>14,.0f}")
+
+    capacity = 10_000
+    print(f"\nWorker processes sharing {capacity:,} entries, {args.n:,} ops each (ops/sec, hit ratio)")
+    print(f"{'workers':<10}{'shared':>22}{'private, same memory':>26}{'private, N x memory':>26}")
+    for workers in (1, 2, 4, 8):
+        cells = ""
+        for shared, per_worker in ((True, capacity), (False, capacity // workers), (False, capacity)):
+            rate, ratio = bench_processes(workers, args.n, per_worker, shared)
+            cells += f"{rate:>18,.0f} ({ratio:.2f})"
+        print(f"{workers:<10}{cells}")
+
+    print(f"\nEviction policies replaying key streams, capacity {args.capacity:,}")
+    traces = synthetic_traces(args.n)
+    traces.update((path, load_trace(path)) for path in args.trace)
+    report_policies(traces, args.capacity)
+
+    print("\nCold-cache herd, 10,000 coroutines on 10 hot keys")
+    print(f"{'mode':<16}{'loader calls':>14}{'seconds':>10}")
+    for name, coalesce in (("get-then-set", False), ("AsyncLRUCache", True)):
+        calls, seconds = bench_herd(coalesce, 10_000, 10)
+        print(f"{name:<16}{calls:>14,}{seconds:>10.3f}")
+
+    print(f"\nTime to a warm cache of {args.entries:,} entries (seconds)")
+    bench_startup(args.entries)
+
+    print(f"\nMemory per entry at {args.entries:,} entries (bytes)")
+    for name, cls in (("baseline", BaselineLRUCache), ("LRU_Cache", LRU_Cache), ("ArrayLRUCache", ArrayLRUCache)):
+        print(f"{name:<16}{bytes_per_entry(cls, args.entries):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
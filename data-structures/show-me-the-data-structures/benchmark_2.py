@@ -0,0 +1,162 @@
+"""
+Benchmarks for find_files in problem_2.py over a generated directory tree.
+
+Run from this directory:
+
+    python benchmark_2.py                  # 1,000,000 files, takes a while to build
+    python benchmark_2.py --files 100000   # files in the synthetic tree
+    python benchmark_2.py --root /data     # walk an existing tree instead
+"""
+import argparse
+import asyncio
+import functools
+import os
+import tempfile
+import time
+from collections import deque
+from typing import Callable
+
+from problem_2 import FileFilter, SuffixIndex, async_iter_files, find_files
+
+
+def baseline_find_files(suffix: str, path: str) -> list[str]:
+    """
+    The original recursive find_files, kept only as a point of comparison.
+
+    It lists each directory with os.listdir, stats every entry with isfile and
+    isdir, and concatenates the result lists of every subdirectory.
+    """
+    if os.path.isfile(path):
+        return [path] if path.endswith(suffix) else []
+    if not os.path.isdir(path):
+        return []
+    result: list[str] = []
+    for name in os.listdir(path):
+        filepath = os.path.join(path, name)
+        if os.path.isfile(filepath) and name.endswith(suffix):
+            result += [filepath]
+        elif os.path.isdir(filepath):
+            result += baseline_find_files(suffix, filepath)
+    return result
+
+
+SUFFIXES = (".c", ".h", ".py", ".txt", ".pdf")
+
+
+def make_tree(root: str, files: int, fanout: int = 10, per_dir: int = 50) -> int:
+    """
+    Create a synthetic tree of empty files under root and return its directory count.
+
+    Directories are filled breadth first, each holding per_dir files and up to
+    fanout subdirectories, so depth grows with the log of the file count.
+    """
+    queue = deque([root])
+    directories = 0
+    created = 0
+    while created < files:
+        directory = queue.popleft()
+        directories += 1
+        for i in range(min(per_dir, files - created)):
+            open(os.path.join(directory, f"f{created}{SUFFIXES[i % len(SUFFIXES)]}"), "w").close()
+            created += 1
+        for i in range(fanout):
+            sub = os.path.join(directory, f"d{i}")
+            os.mkdir(sub)
+            queue.append(sub)
+    return directories
+
+
+def async_find_files(suffix: str, path: str, concurrency: int = 8) -> list[str]:
+    """Collect async_iter_files into a list on a fresh event loop."""
+    async def collect() -> list[str]:
+        return [p async for p in async_iter_files(suffix, path, concurrency)]
+    return asyncio.run(collect())
+
+
+def timed(fn: Callable[[], object]) -> tuple[float, object]:
+    """Return the wall-clock seconds taken by a single call of fn, and its result."""
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def report(walkers: dict[str, Callable[[str, str], list[str]]], root: str, suffix: str) -> None:
+    """Print the time and match count of every walker, relative to the first one."""
+    print(f"{'walker':<24}{'seconds':>10}{'matches':>12}{'speed-up':>10}")
+    first = None
+    for name, walker in walkers.items():
+        seconds, result = timed(lambda: walker(suffix, root))
+        first = first or seconds
+        print(f"{name:<24}{seconds:>10.3f}{len(result):>12,}{first / seconds:>9.2f}x")
+
+
+def backdate(root: str, seconds: float = 3_600) -> None:
+    """Set the mtime of every directory under root into the past, as on a settled tree."""
+    past = time.time() - seconds
+    for directory, _, _ in os.walk(root):
+        os.utime(directory, (past, past))
+
+
+def report_index(root: str, suffixes: tuple[str, ...]) -> None:
+    """Print the cost of building, refreshing and querying a SuffixIndex of root."""
+    with tempfile.TemporaryDirectory() as index_dir:
+        path = os.path.join(index_dir, "index.json")
+        index = SuffixIndex(root, path, max_age=0)
+        seconds, listed = timed(index.refresh)
+        print(f"{'build index':<32}{seconds:>10.3f}   {listed:,} directories listed")
+        seconds, listed = timed(lambda: SuffixIndex(root, path).dirs)
+        print(f"{'load index':<32}{seconds:>10.3f}")
+        seconds, listed = timed(index.refresh)
+        print(f"{'refresh, nothing changed':<32}{seconds:>10.3f}   {listed:,} directories listed")
+        index.max_age = float("inf")
+        live = sum(timed(lambda: find_files(s, root))[0] for s in suffixes)
+        indexed = sum(timed(lambda: index.find_files(s))[0] for s in suffixes)
+        print(f"{f'{len(suffixes)} suffixes, live walks':<32}{live:>10.3f}")
+        print(f"{f'{len(suffixes)} suffixes, index lookups':<32}{indexed:>10.3f}")
+
+
+def report_filters(root: str) -> None:
+    """Print the cost of separate walks per suffix against one filtered walk."""
+    separate = sum(timed(lambda: find_files(s, root))[0] for s in (".c", ".h"))
+    together, found = timed(lambda: find_files((".c", ".h"), root))
+    pruned, kept = timed(lambda: find_files((".c", ".h"), root, filters=FileFilter(prune=["d1", "d2"])))
+    print(f"{'.c and .h, two walks':<32}{separate:>10.3f}")
+    print(f"{'.c and .h, one walk':<32}{together:>10.3f}   {len(found):,} matches")
+    print(f"{'one walk, d1 and d2 pruned':<32}{pruned:>10.3f}   {len(kept):,} matches")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1_000_000, help="files in the synthetic tree")
+    parser.add_argument("--root", help="walk this existing tree instead of a synthetic one")
+    parser.add_argument("--suffix", default=".c", help="suffix to search for")
+    args = parser.parse_args()
+
+    walkers: dict[str, Callable[[str, str], list[str]]] = {
+        "baseline (recursive)": baseline_find_files,
+        "find_files (scandir)": find_files,
+    }
+    for workers in (4, 8, 16):
+        walkers[f"{workers} threads"] = functools.partial(find_files, workers=workers)
+    walkers["8 threads, ordered"] = functools.partial(find_files, workers=8, ordered=True)
+    walkers["async, 8 in flight"] = async_find_files
+    if args.root:
+        report(walkers, args.root, args.suffix)
+        print()
+        report_filters(args.root)
+        print()
+        report_index(args.root, SUFFIXES)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        seconds, directories = timed(lambda: make_tree(tmp, args.files))
+        backdate(tmp)
+        print(f"Synthetic tree: {args.files:,} files in {directories:,} directories ({seconds:.1f}s to build)")
+        report(walkers, tmp, args.suffix)
+        print()
+        report_filters(tmp)
+        print()
+        report_index(tmp, SUFFIXES)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Benchmarks for the Huffman codecs in problem_3.py.
+
+Run from this directory:
+
+    python benchmark_3.py                  # 1 MB per corpus
+    python benchmark_3.py --size 200000    # bytes per synthetic corpus
+    python benchmark_3.py --file big.log   # also compress an existing file
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from problem_3 import (_CHUNK, _numpy_byte_frequencies, _python_byte_frequencies, BlockReader,
+                       HuffmanDictionary, adaptive_compress, adaptive_decompress, calculate_frequencies,
+                       canonical_codes, compress_stream, decompress_stream, deserialize_code_lengths,
+                       huffman_compress, huffman_decompress, huffman_decoding, huffman_encoding,
+                       parallel_compress_stream, tree_from_codes)
+
+WORDS = ("the of and to in is that for it as with was on be by this are from or an "
+         "huffman code tree node byte table symbol stream block length frequency").split()
+
+
+def tree_decompress(blob: bytes) -> bytes:
+    """
+    The first huffman_decompress, kept only as a point of comparison.
+
+    It rebuilds a tree from the header and takes one tree step per bit.
+    """
+    lengths, length, offset = deserialize_code_lengths(blob)
+    tree = tree_from_codes(canonical_codes(lengths))
+    out = bytearray()
+    node = tree
+    for start in range(offset, len(blob), _CHUNK):
+        chunk = blob[start:start + _CHUNK]
+        for bit in format(int.from_bytes(chunk, "big"), f"0{len(chunk) * 8}b"):
+            node = node.left if bit == "0" else node.right
+            if node.char is not None:
+                out.append(node.char)
+                node = tree
+    return bytes(out[:length])
+
+
+def corpora(size: int, seed: int = 0) -> dict[str, bytes]:
+    """Return synthetic inputs of about size bytes with very different entropy."""
+    rng = random.Random(seed)
+    text = " ".join(rng.choice(WORDS) for _ in range(size // 4)).encode()[:size]
+    return {
+        "english-like text": text,
+        "uppercase letters": bytes(rng.choices(range(65, 91), k=size)),
+        "skewed bytes": bytes(min(int(rng.expovariate(0.5)), 255) for _ in range(size)),
+        "random bytes": rng.randbytes(size),
+    }
+
+
+def timed(fn: Callable[[], object]) -> tuple[float, object]:
+    """Return the wall-clock seconds taken by a single call of fn, and its result."""
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def throughput(size: int, seconds: float) -> float:
+    """Megabytes of input handled per second."""
+    return size / seconds / 1e6
+
+
+def report_codecs(inputs: dict[str, bytes]) -> None:
+    """Print ratio and round-trip throughput of the string and byte codecs on every input."""
+    print(f"{'input':<20}{'codec':<10}{'ratio':>8}{'enc MB/s':>10}{'dec MB/s':>10}{'header':>8}")
+    for name, data in inputs.items():
+        text = data.decode("latin-1")
+        seconds, (bits, tree) = timed(lambda: huffman_encoding(text))
+        back, decoded = timed(lambda: huffman_decoding(bits, tree))
+        assert decoded == text
+        # The string codec spends one byte of output on every bit
+        print(f"{name:<20}{'str':<10}{len(bits) / len(data):>8.3f}"
+              f"{throughput(len(data), seconds):>10.2f}{throughput(len(data), back):>10.2f}")
+        seconds, blob = timed(lambda: huffman_compress(data))
+        back, decoded = timed(lambda: huffman_decompress(blob))
+        assert decoded == data
+        print(f"{'':<20}{'bytes':<10}{len(blob) / len(data):>8.3f}"
+              f"{throughput(len(data), seconds):>10.2f}{throughput(len(data), back):>10.2f}"
+              f"{deserialize_code_lengths(blob)[2]:>8}")
+
+
+def report_decoders(inputs: dict[str, bytes]) -> None:
+    """Print the throughput of the tree-walking and table-driven decoders."""
+    print(f"{'input':<20}{'tree MB/s':>10}{'table MB/s':>12}{'speed-up':>10}")
+    for name, data in inputs.items():
+        blob = huffman_compress(data)
+        walk, walked = timed(lambda: tree_decompress(blob))
+        table, looked_up = timed(lambda: huffman_decompress(blob))
+        assert walked == looked_up == data
+        print(f"{name:<20}{throughput(len(data), walk):>10.2f}{throughput(len(data), table):>12.2f}"
+              f"{walk / table:>9.2f}x")
+
+
+def report_small_payloads(inputs: dict[str, bytes], sizes: tuple[int, ...] = (70, 1_000, 4_096, 65_536)) -> None:
+    """
+    Print the time per message of the tree-walking decoder and huffman_decompress on short inputs.
+
+    Every message is a different slice, so most of them bring a table that
+    huffman_decompress has not seen yet.
+    """
+    print(f"{'input':<20}{'size':>8}{'tree us/msg':>13}{'decompress us/msg':>19}{'speed-up':>10}")
+    for name, data in inputs.items():
+        for size in sizes:
+            count = max(1, min(500, len(data) // size))
+            blobs = [huffman_compress(data[i * size:(i + 1) * size]) for i in range(count)]
+            walk, walked = timed(lambda: [tree_decompress(blob) for blob in blobs])
+            table, decoded = timed(lambda: [huffman_decompress(blob) for blob in blobs])
+            assert walked == decoded
+            print(f"{name if size == sizes[0] else '':<20}{size:>8,}{walk / count * 1e6:>13.1f}"
+                  f"{table / count * 1e6:>19.1f}{walk / table:>9.2f}x")
+
+
+def report_streaming(inputs: dict[str, bytes], block_sizes: tuple[int, ...] = (1 << 16, 1 << 20)) -> None:
+    """
+    Print ratio, throughput and peak traced memory of compress_stream between files.
+
+    The inputs are written one after another into one file, so the per-block
+    tables have to follow the changes in content.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        original = os.path.join(tmp, "original")
+        packed = os.path.join(tmp, "packed")
+        with open(original, "wb") as f:
+            for data in inputs.values():
+                f.write(data)
+        size = os.path.getsize(original)
+        with open(original, "rb") as f:
+            whole = len(huffman_compress(f.read()))
+        print(f"{len(inputs)} inputs, {size:,} bytes; one table for everything: ratio {whole / size:.3f}")
+        print(f"{'block size':<12}{'ratio':>8}{'enc MB/s':>10}{'dec MB/s':>10}{'peak MB':>10}")
+        for block_size in block_sizes:
+            with open(original, "rb") as source, open(packed, "wb") as sink:
+                seconds, _ = timed(lambda: compress_stream(source, sink, block_size))
+            with open(packed, "rb") as source, open(os.devnull, "wb") as sink:
+                back, _ = timed(lambda: decompress_stream(source, sink))
+            tracemalloc.start()
+            with open(original, "rb") as source, open(os.devnull, "wb") as sink:
+                compress_stream(source, sink, block_size)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{block_size:<12,}{os.path.getsize(packed) / size:>8.3f}{throughput(size, seconds):>10.2f}"
+                  f"{throughput(size, back):>10.2f}{peak / 1e6:>10.2f}")
+
+
+def report_parallel(inputs: dict[str, bytes], block_size: int = 1 << 20,
+                    workers: tuple[int, ...] = (1, 2, 4, 8)) -> None:
+    """Print the throughput of block-parallel compression and decompression between files."""
+    print(f"{os.cpu_count()} CPUs, {block_size:,}-byte blocks")
+    print(f"{'mode':<20}{'enc MB/s':>10}{'dec MB/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        original = os.path.join(tmp, "original")
+        packed = os.path.join(tmp, "packed")
+        with open(original, "wb") as f:
+            for data in inputs.values():
+                f.write(data)
+        size = os.path.getsize(original)
+        with open(original, "rb") as source, open(packed, "wb") as sink:
+            seconds, _ = timed(lambda: compress_stream(source, sink, block_size))
+        with open(packed, "rb") as source, open(os.devnull, "wb") as sink:
+            back, _ = timed(lambda: decompress_stream(source, sink))
+        print(f"{'serial stream':<20}{throughput(size, seconds):>10.2f}{throughput(size, back):>10.2f}")
+        for count in workers:
+            with open(original, "rb") as source, open(packed, "wb") as sink:
+                seconds, _ = timed(lambda: parallel_compress_stream(source, sink, block_size, count))
+            with open(packed, "rb") as source, open(os.devnull, "wb") as sink:
+                back, _ = timed(lambda: BlockReader(source).decompress_to(sink, count))
+            print(f"{f'{count} processes':<20}{throughput(size, seconds):>10.2f}{throughput(size, back):>10.2f}")
+        with open(packed, "rb") as source:
+            reader = BlockReader(source)
+            seconds, _ = timed(lambda: reader.read(size // 2, 100))
+        print(f"{'read 100 bytes':<20}{seconds * 1e3:>10.2f} ms from the middle of the container")
+
+
+def report_numpy(inputs: dict[str, bytes]) -> None:
+    """Print the throughput of byte frequency counting with and without NumPy."""
+    try:
+        import numpy
+    except ImportError:
+        print("NumPy is not installed; skipping the vectorized paths")
+        return
+    print(f"{'input':<20}{'dict loop':>10}{'Counter':>10}{'NumPy':>10}   MB/s")
+    for name, data in inputs.items():
+        text = data.decode("latin-1")
+        loop, _ = timed(lambda: calculate_frequencies(text))
+        counter, _ = timed(lambda: _python_byte_frequencies(data))
+        vector, _ = timed(lambda: _numpy_byte_frequencies(data))
+        print(f"{name:<20}{throughput(len(data), loop):>10.2f}{throughput(len(data), counter):>10.2f}"
+              f"{throughput(len(data), vector):>10.2f}")
+
+
+def report_adaptive(inputs: dict[str, bytes]) -> None:
+    """Print ratio and throughput of the single-pass adaptive coder against the static two-pass one."""
+    print(f"{'input':<20}{'codec':<10}{'ratio':>8}{'enc MB/s':>10}{'dec MB/s':>10}")
+    for name, data in inputs.items():
+        for codec, compress, decompress in (("static", huffman_compress, huffman_decompress),
+                                            ("adaptive", adaptive_compress, adaptive_decompress)):
+            seconds, blob = timed(lambda: compress(data))
+            back, decoded = timed(lambda: decompress(blob))
+            assert decoded == data
+            print(f"{name if codec == 'static' else '':<20}{codec:<10}{len(blob) / len(data):>8.3f}"
+                  f"{throughput(len(data), seconds):>10.2f}{throughput(len(data), back):>10.2f}")
+
+
+def report_dictionary(text: bytes, messages: int = 20_000, seed: int = 0) -> None:
+    """Print size and speed of per-message tables against a trained dictionary on short messages."""
+    rng = random.Random(seed)
+    starts = [rng.randrange(len(text) - 120) for _ in range(messages)]
+    sample = [text[start:start + rng.randint(20, 120)] for start in starts]
+    size = sum(map(len, sample))
+    seconds, dictionary = timed(lambda: HuffmanDictionary.train(sample[:1000]))
+    print(f"{messages:,} messages, {size / messages:.0f} bytes on average; trained on 1,000 in {seconds * 1e3:.1f} ms")
+    print(f"{'codec':<20}{'ratio':>8}{'enc msg/s':>12}{'dec msg/s':>12}")
+    for codec, encode, decode in (("table per message", huffman_compress, huffman_decompress),
+                                  ("trained dictionary", dictionary.encode, dictionary.decode)):
+        seconds, encoded = timed(lambda: [encode(message) for message in sample])
+        back, decoded = timed(lambda: [decode(blob) for blob in encoded])
+        assert decoded == sample
+        print(f"{codec:<20}{sum(map(len, encoded)) / size:>8.3f}{messages / seconds:>12,.0f}{messages / back:>12,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000, help="bytes per synthetic corpus")
+    parser.add_argument("--file", action="append", default=[], help="file to compress as well")
+    args = parser.parse_args()
+
+    inputs = corpora(args.size)
+    for path in args.file:
+        with open(path, "rb") as f:
+            inputs[path] = f.read()
+    report_codecs(inputs)
+    print()
+    report_numpy(inputs)
+    print()
+    report_decoders(inputs)
+    print()
+    report_small_payloads(inputs)
+    print()
+    report_streaming(inputs)
+    print()
+    report_adaptive(inputs)
+    print()
+    report_dictionary(inputs["english-like text"])
+    print()
+    report_parallel(inputs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmarks for is_user_in_group in problem_4.py over a generated group hierarchy.
+
+Run from this directory:
+
+    python benchmark_4.py                   # 5,000 groups of 10 users
+    python benchmark_4.py --groups 20000    # groups in the hierarchy
+    python benchmark_4.py -n 100000         # membership checks per scenario
+"""
+import argparse
+import random
+import time
+from typing import Callable
+
+from problem_4 import Group, is_user_in_group, users_in_group
+
+
+def baseline_is_user_in_group(user: str, group: Group) -> bool:
+    """
+    The original depth-first search, kept only as a point of comparison.
+
+    It visits every group below group and scans each user list.
+    """
+    if user is None or group is None:
+        return False
+    stack = [group]
+    while stack:
+        current_group = stack.pop()
+        if user in current_group.get_users():
+            return True
+        stack.extend(current_group.get_groups())
+    return False
+
+
+def baseline_users_in_group(group: Group) -> set[str]:
+    """
+    Collect members with the original search, which keeps no visited set.
+
+    A group reachable along several paths is expanded once per path.
+    """
+    users: set[str] = set()
+    stack = [group]
+    while stack:
+        current_group = stack.pop()
+        users |= current_group.get_users()
+        stack.extend(current_group.get_groups())
+    return users
+
+
+def make_diamonds(depth: int) -> Group:
+    """
+    Return the top of a lattice of depth diamonds, with one user at the bottom.
+
+    Each layer is a group holding two groups that both hold the next layer,
+    so 2 ** depth paths lead to the bottom through only 3 * depth + 1 groups.
+    """
+    bottom = Group("layer0")
+    bottom.add_user("deep_user")
+    for i in range(1, depth + 1):
+        left, right = Group(f"left{i}"), Group(f"right{i}")
+        left.add_group(bottom)
+        right.add_group(bottom)
+        bottom = Group(f"layer{i}")
+        bottom.add_group(left)
+        bottom.add_group(right)
+    return bottom
+
+
+def make_hierarchy(groups: int, users_per_group: int, seed: int = 0) -> list[Group]:
+    """
+    Build a random tree of groups, each with its own users, and return the groups root first.
+
+    Every new group is added under a random earlier one, so depth grows with
+    the log of the group count, as in an org chart.
+    """
+    rng = random.Random(seed)
+    hierarchy = [Group("g0")]
+    for i in range(1, groups):
+        group = Group(f"g{i}")
+        rng.choice(hierarchy).add_group(group)
+        hierarchy.append(group)
+    for i, group in enumerate(hierarchy):
+        for j in range(users_per_group):
+            group.add_user(f"u{i}-{j}")
+    return hierarchy
+
+
+def timed(fn: Callable[[], object]) -> tuple[float, object]:
+    """Return the wall-clock seconds taken by a single call of fn, and its result."""
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def report(hierarchy: list[Group], users_per_group: int, n: int, seed: int = 0) -> None:
+    """Print membership checks per second of the DFS and the index, from the root and from random groups."""
+    rng = random.Random(seed)
+    queries = [f"u{rng.randrange(len(hierarchy))}-{rng.randrange(users_per_group)}" for _ in range(n)]
+    missing = [f"nobody{i}" for i in range(n)]
+    roots = [hierarchy[0]] * n
+    anywhere = [rng.choice(hierarchy) for _ in range(n)]
+    print(f"{'scenario':<28}{'DFS checks/s':>16}{'index checks/s':>16}{'speed-up':>10}")
+    for name, users, groups in (("root, present", queries, roots), ("root, absent", missing, roots),
+                                ("random group, mixed", queries, anywhere)):
+        # The DFS is slow enough that a slice of the queries gives a stable rate
+        count = max(1, n // 100)
+        dfs, expected = timed(lambda: [baseline_is_user_in_group(u, g) for u, g in zip(users[:count], groups)])
+        index, found = timed(lambda: [is_user_in_group(u, g) for u, g in zip(users, groups)])
+        assert found[:count] == expected
+        print(f"{name:<28}{count / dfs:>16,.0f}{n / index:>16,.0f}{(dfs / count) / (index / n):>9.0f}x")
+
+
+def report_export(hierarchy: list[Group], depths: tuple[int, ...] = (10, 14, 18)) -> None:
+    """Print the time of a bulk member export with and without a visited set."""
+    print(f"{'export':<28}{'no visited set':>16}{'users_in_group':>16}")
+    without, expected = timed(lambda: baseline_users_in_group(hierarchy[0]))
+    with_seen, found = timed(lambda: users_in_group(hierarchy[0]))
+    assert found == expected
+    print(f"{f'tree of {len(hierarchy):,} groups':<28}{without:>15.4f}s{with_seen:>15.4f}s")
+    for depth in depths:
+        top = make_diamonds(depth)
+        without, expected = timed(lambda: baseline_users_in_group(top))
+        with_seen, found = timed(lambda: users_in_group(top))
+        assert found == expected == {"deep_user"}
+        print(f"{f'{depth} stacked diamonds':<28}{without:>15.4f}s{with_seen:>15.4f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=5_000, help="groups in the hierarchy")
+    parser.add_argument("--users", type=int, default=10, help="users added directly to each group")
+    parser.add_argument("-n", type=int, default=100_000, help="membership checks per scenario")
+    args = parser.parse_args()
+
+    seconds, hierarchy = timed(lambda: make_hierarchy(args.groups, args.users))
+    indexed = sum(len(group.all_users) for group in hierarchy)
+    print(f"{args.groups:,} groups, {args.groups * args.users:,} users: built in {seconds:.2f}s, "
+          f"{indexed:,} indexed memberships")
+    report(hierarchy, args.users, args.n)
+    print()
+    report_export(hierarchy)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,35 @@
-from typing import Any, Optional
+import asyncio
+import functools
+import heapq
+import inspect
+import mmap
+import multiprocessing
+import os
+import threading
+import time
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, Awaitable, Callable, Optional
 
 class Node:
     """
-    A class to represent a node in a linked list.
+    A class to represent a node in a doubly linked list.
 
     Attributes:
     -----------
+    key : Optional[int]
+        The cache key the node belongs to, so evicting the tail needs no reverse lookup.
     value : int
         The value stored in the node.
     next : Optional[Node]
         The reference to the next node in the linked list.
+    prev : Optional[Node]
+        The reference to the previous node in the linked list.
     """
 
-    def __init__(self, value: int) -> None:
+    __slots__ = ("key", "value", "next", "prev")
+
+    def __init__(self, value: int, key: Optional[int] = None) -> None:
         """
         Constructs all the necessary attributes for the Node object.
 
@@ -20,7 +37,10 @@ class Node:
         -----------
         value : int
             The value to be stored in the node.
+        key : Optional[int]
+            The cache key stored alongside the value.
         """
+        self.key: Optional[int] = key
         self.value: int = value
         self.next: Optional[Node] = None
         self.prev: Optional[Node] = None
@@ -121,16 +141,71 @@ class LinkedList:
         >>> test
         2 -> 1 -> 
         """
+        return self.push_front(Node(value))
+
+    def push_front(self, node: Node) -> Node:
+        """
+        Link an existing, detached node in at the beginning of the list.
+
+        Parameters:
+        -----------
+        node : Node
+            The node to become the new head. It must not currently be in a list.
+
+        >>> test = LinkedList()
+        >>> test.push_front(Node(1, key=10))
+        1
+        >>> test.push_front(Node(2, key=20)).key
+        20
+        >>> test
+        2 -> 1 -> 
+        """
+        node.prev = None
+        node.next = self.head
         if self.head is None:
-            self.head = Node(value)
-            self.tail = self.head
-            return self.head
-        
-        newHead = Node(value)
-        newHead.next = self.head
-        self.head.prev = newHead
-        self.head = newHead
-        return self.head
+            self.tail = node
+        else:
+            self.head.prev = node
+        self.head = node
+        return node
+
+    def move_to_front(self, node: Node) -> None:
+        """
+        Move a node that is already in the list to the beginning, in place.
+
+        Only the neighbouring links are rewritten; no node is allocated.
+
+        Parameters:
+        -----------
+        node : Node
+            A node currently linked into this list.
+
+        >>> example = LinkedList()
+        >>> for x in range(1,4):
+        ...     example.append(x)
+        >>> example.move_to_front(example.tail)
+        >>> example
+        3 -> 1 -> 2 -> 
+        >>> example.tail
+        2
+        >>> example.move_to_front(example.head)
+        >>> example
+        3 -> 1 -> 2 -> 
+        """
+        prev = node.prev
+        if prev is None:
+            return
+        nxt = node.next
+        prev.next = nxt
+        if nxt is None:
+            self.tail = prev
+        else:
+            nxt.prev = prev
+        node.prev = None
+        node.next = self.head
+        assert self.head
+        self.head.prev = node
+        self.head = node
 
     def remove(self, node: Node) -> Optional[Node]:
         """
@@ -154,9 +229,10 @@ class LinkedList:
         if node is None:
             return
 
-        if self.head == node:
+        if self.head is node:
             if node.next is not None:
                 self.head = node.next
+                self.head.prev = None
             else:
                 self.head = None
                 self.tail = None
@@ -169,6 +245,8 @@ class LinkedList:
                 assert node.prev
                 node.prev.next = node.next
                 node.next.prev = node.prev
+        node.next = None
+        node.prev = None
         return node
 
     # def tail(self) -> Optional[Node]:
@@ -198,6 +276,101 @@ class LinkedList:
         self.curr = self.curr.next
         return result
 
+class CacheStats:
+    """
+    Counters and latency histograms describing how a cache is being used.
+
+    Latencies are kept in power-of-two nanosecond buckets: bucket i counts the
+    operations that took fewer than 2**i nanoseconds but at least 2**(i - 1).
+
+    Attributes:
+    -----------
+    timing : bool
+        Whether operation latencies are recorded, on top of the counters.
+    hits : int
+        The gets that found their key.
+    misses : int
+        The gets that did not.
+    sets : int
+        The calls to set.
+    evictions : int
+        The entries a set pushed out of the cache, or refused to admit.
+    get_ns : list[int]
+        The histogram of get latencies.
+    set_ns : list[int]
+        The histogram of set latencies.
+    """
+
+    def __init__(self, timing: bool = True) -> None:
+        """
+        Constructs all the necessary attributes for the CacheStats object.
+
+        Parameters:
+        -----------
+        timing : bool
+            Whether to record operation latencies as well as counts.
+        """
+        self.timing: bool = timing
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Set every counter and histogram back to zero.
+        """
+        self.hits: int = 0
+        self.misses: int = 0
+        self.sets: int = 0
+        self.evictions: int = 0
+        self.get_ns: list[int] = [0] * 64
+        self.set_ns: list[int] = [0] * 64
+
+    @staticmethod
+    def percentile(histogram: list[int], q: float) -> int:
+        """
+        Return the upper bound in nanoseconds of the bucket holding quantile q.
+
+        >>> CacheStats.percentile([0, 0, 3, 1] + [0] * 60, 0.5)
+        4
+        >>> CacheStats.percentile([0] * 64, 0.5)
+        0
+        """
+        total = sum(histogram)
+        if total == 0:
+            return 0
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(histogram):
+            seen += count
+            if seen >= rank:
+                return 1 << i
+        return 1 << (len(histogram) - 1)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Return the current figures as a plain dict, e.g. for a metrics scraper.
+
+        >>> stats = CacheStats(timing=False)
+        >>> stats.hits, stats.misses = 3, 1
+        >>> snap = stats.snapshot()
+        >>> snap["hits"], snap["misses"], snap["hit_ratio"]
+        (3, 1, 0.75)
+        """
+        lookups = self.hits + self.misses
+        snapshot: dict[str, Any] = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+        if self.timing:
+            for op, histogram in (("get", self.get_ns), ("set", self.set_ns)):
+                snapshot[f"{op}_ns_histogram"] = {1 << i: n for i, n in enumerate(histogram) if n}
+                for q in (0.5, 0.9, 0.99):
+                    snapshot[f"{op}_ns_p{round(q * 100)}"] = self.percentile(histogram, q)
+        return snapshot
+
+
 class LRU_Cache:
     """
     A class to represent a Least Recently Used (LRU) cache.
@@ -206,11 +379,12 @@ class LRU_Cache:
     -----------
     capacity : int
         The maximum number of items the cache can hold.
-    cache : dict[int, int]
-        The dictionary to point to index
-    data: LinkedList
-    
-    
+    cache : dict[int, Node]
+        The dictionary from key to the node holding its value.
+    data : LinkedList
+        The nodes in recency order, most recently used at the head.
+    stats : Optional[CacheStats]
+        The usage statistics while enabled with enable_stats(), otherwise None.
     """
 
     def __init__(self, capacity: int) -> None:
@@ -225,14 +399,90 @@ class LRU_Cache:
         assert capacity > 0, "Capacity must be positive"
         self.capacity: int = capacity
         self.cache: dict[int, Node] = {}
-        self.revcache: dict[Node, int] = {}
         self.data: LinkedList = LinkedList()
+        self.stats: Optional[CacheStats] = None
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries in the cache.
+        """
+        return len(self.cache)
+
+    def enable_stats(self, timing: bool = True) -> CacheStats:
+        """
+        Start recording hits, misses, sets and evictions, and optionally latencies.
 
+        Instrumented get and set methods are bound on this instance only, so a
+        cache without stats runs the plain methods and pays nothing for them.
+
+        Parameters:
+        -----------
+        timing : bool
+            Whether to record a latency histogram for get and set.
+
+        Returns:
+        --------
+        CacheStats
+            The live statistics, also available as the stats attribute.
+
+        >>> cache = LRU_Cache(1)
+        >>> stats = cache.enable_stats(timing=False)
+        >>> cache.set(1, 1); cache.set(2, 2)
+        >>> cache.get(1), cache.get(2)
+        (-1, 2)
+        >>> stats.hits, stats.misses, stats.sets, stats.evictions
+        (1, 1, 2, 1)
+        """
+        self.disable_stats()
+        stats = CacheStats(timing)
+        plain_get = type(self).get
+        plain_set = type(self).set
+        cache = self.cache
+        perf_counter_ns = time.perf_counter_ns
+
+        def get(key: int) -> Any:
+            if timing:
+                start = perf_counter_ns()
+                value = plain_get(self, key)
+                stats.get_ns[(perf_counter_ns() - start).bit_length()] += 1
+            else:
+                value = plain_get(self, key)
+            if type(value) is int and value == -1:
+                stats.misses += 1
+            else:
+                stats.hits += 1
+            return value
+
+        def set(key: int, value: Any, *args: Any, **kwargs: Any) -> None:
+            before = len(cache) + (key not in cache)
+            if timing:
+                start = perf_counter_ns()
+                plain_set(self, key, value, *args, **kwargs)
+                stats.set_ns[(perf_counter_ns() - start).bit_length()] += 1
+            else:
+                plain_set(self, key, value, *args, **kwargs)
+            stats.sets += 1
+            stats.evictions += before - len(cache)
+
+        self.get = get  # type: ignore[method-assign]
+        self.set = set  # type: ignore[method-assign]
+        self.stats = stats
+        return stats
+
+    def disable_stats(self) -> None:
+        """
+        Stop recording statistics and restore the plain get and set methods.
+        """
+        self.__dict__.pop("get", None)
+        self.__dict__.pop("set", None)
+        self.stats = None
 
     def get(self, key: int) -> int:
         """
         Get the value of the key if the key exists in the cache, otherwise return -1.
 
+        A hit moves the existing node to the head of the list; nothing is allocated.
+
         Parameters:
         -----------
         key : int
@@ -240,16 +490,14 @@ class LRU_Cache:
 
         Returns:
         --------
-        Optional[Any]
+        int
             The value associated with the key if it exists, otherwise -1.
         """
         node = self.cache.get(key)
-        if node is not None:
-                self.data.remove(node)
-                self.cache[key] = self.data.prepend(node.value)
-                return node.value
-        else:
+        if node is None:
             return -1
+        self.data.move_to_front(node)
+        return node.value
 
     def set(self, key: int, value: int) -> None:
         """
@@ -267,130 +515,2215 @@ class LRU_Cache:
         assert isinstance(key, int), "Invalid key input type"
         assert isinstance(value, int), "Invalid value input type"
         assert value >= 0, "Negative values reserved for missing keys"
-        if self.get(key) == -1:
-            if len(self.cache) >= self.capacity:
-                tail = self.data.tail
-                if tail is not None:
-                    self.data.remove(tail)
-                    kkey = self.revcache.get(tail)
-                    assert kkey
-                    del self.cache[kkey]
-                    self.cache[key] = self.data.prepend(value)
-                    self.revcache[self.cache[key]] = key
-            else:
-                self.cache[key] = self.data.prepend(value)
-                self.revcache[self.cache[key]] = key
-            
+        self._put(key, value)
+
+    def _put(self, key: int, value: int) -> None:
+        """
+        Insert or update a key without validating it, evicting the tail if full.
+
+        An update rewrites the node's value in place. When the cache is full the
+        evicted tail node is recycled for the new key instead of allocating one.
+        """
+        node = self.cache.get(key)
+        if node is not None:
+            node.value = value
+            self.data.move_to_front(node)
             return
-        elif self.get(key) != value:
-            # The key was found in the cache using get, but does not match the value we are setting it to
-            #Therefore `get`` has moved the key/value to the head of the list
-            assert self.data.head
-            #the head should exist or else it is contradictory that we found a value 
-            #However, the value does not match the new value being set, so we remove the node
-            self.data.remove(self.data.head)
-            #we now add the new value back as a new node
-            # and update the cache which points from the key to the value node for the key
-            self.cache[key] = self.data.prepend(value)
-            # We update the reverse cache which points from a node to a key
-            self.revcache[self.cache[key]] = key
-            # neither the cache or the reverse cache should ever have problems with duplicates
-            # the key should be unique and there should only be one node holding a value for a key
 
+        if len(self.cache) >= self.capacity:
+            node = self.data.tail
+            assert node
+            del self.cache[node.key]
+            node.key = key
+            node.value = value
+            self.data.move_to_front(node)
+        else:
+            node = self.data.push_front(Node(value, key))
+        self.cache[key] = node
 
-if __name__ == '__main__':
-    # Testing the LRU_Cache class
 
-    # Test Case 1: Basic functionality
-    our_cache = LRU_Cache(5)
-    our_cache.set(1, 1)
-    our_cache.set(2, 2)
-    our_cache.set(3, 3)
-    our_cache.set(4, 4)
-    assert our_cache.get(1) == 1   # Returns 1
-    assert our_cache.get(2) == 2   # Returns 2
-    assert our_cache.get(9) == -1  # Returns -1 because 9 is not in the cache
+class LFUNode(Node):
+    """
+    A linked list node that also counts how often its key has been used.
 
-    our_cache.set(5, 5)
-    our_cache.set(6, 6)  # This should evict key 3
-    assert our_cache.get(3) == -1  # Returns -1, 3 was evicted
+    Attributes:
+    -----------
+    count : int
+        The number of accesses recorded for the key.
+    """
 
-    # Test Case 2
-    test_cache = LRU_Cache(3)
-    test_cache.set(2,3)
-    test_cache.set(2,4)
-    assert len(test_cache.cache) == 1
-    assert test_cache.get(2) == 4
+    __slots__ = ("count",)
 
-    # Test Case 3
-    # Eviction extreme case
-    test_cache2 = LRU_Cache(1)
-    test_cache2.set(1,1)
-    test_cache2.set(2,2)
-    test_cache2.set(3,3)
-    assert test_cache2.get(1) == -1
-    assert test_cache2.get(2) == -1
-    assert test_cache2.get(3) == 3
+    def __init__(self, value: int, key: Optional[int] = None) -> None:
+        """
+        Constructs a node for a key that has been used once.
+        """
+        super().__init__(value, key)
+        self.count: int = 1
 
-    # test Case 4
-    # updated key is evicted
-    test_cache3=LRU_Cache(2)
-    test_cache3.set(1,1)
-    assert len(test_cache3.cache) == 1
-    test_cache3.set(1,2)
-    assert len(test_cache3.cache) == 1
-    test_cache3.set(2,2)
-    assert len(test_cache3.cache) == 2
-    test_cache3.set(3,3)
-    assert len(test_cache3.cache) == 2
-    assert test_cache3.get(1) == -1
-    assert test_cache3.get(3) == 3
-    assert test_cache3.get(2) == 2
 
-    #test cases for invalid values
-    test_bad = LRU_Cache(5)
-    try:
-        test_bad.set(None, 1)
-    except AssertionError as err:
-        assert repr(err) == "AssertionError('Invalid key input type')"
+class LFUCache:
+    """
+    A Least Frequently Used (LFU) cache with O(1) get and set.
 
-    try:
-        test_bad.set(1, None)
-    except AssertionError as err:
-        assert repr(err) ==  "AssertionError('Invalid value input type')"
+    Nodes are grouped into one recency list per access count, so the victim is the
+    least recently used key among those with the lowest count.
 
-    try:
-        test_bad.set(1, -2)
-    except AssertionError as err:
-        assert repr(err) == "AssertionError('Negative values reserved for missing keys')"
+    Attributes:
+    -----------
+    capacity : int
+        The maximum number of items the cache can hold.
+    cache : dict[int, LFUNode]
+        The dictionary from key to the node holding its value.
+    buckets : dict[int, LinkedList]
+        The nodes with each access count, most recently used at the head.
+    min_count : int
+        The lowest access count of any key in the cache.
+    """
 
-    test_bad.set(1,1)
-    for i in range(0, 1_000_000):
-        test_bad.get(1)
-    assert len(test_bad.cache) == 1
-    assert test_bad.get(1) == 1
-    
-    for i in range(0, 1_000_000):
-        test_bad.set(1, i)
-    assert len(test_bad.cache) == 1
-    assert test_bad.get(1) == 999_999
+    def __init__(self, capacity: int) -> None:
+        """
+        Constructs all the necessary attributes for the LFUCache object.
 
-    try:
-        bad_cap = LRU_Cache(-10)
-    except AssertionError as err:
-        assert repr(err) == "AssertionError('Capacity must be positive')"
+        Parameters:
+        -----------
+        capacity : int
+            The maximum number of items the cache can hold.
+        """
+        assert capacity > 0, "Capacity must be positive"
+        self.capacity: int = capacity
+        self.cache: dict[int, LFUNode] = {}
+        self.buckets: dict[int, LinkedList] = {}
+        self.min_count: int = 0
 
-    test_duplicates = LRU_Cache(5)
-    test_duplicates.set(999_999_999, 1)
-    test_duplicates.set(1_000_000_000, 1)
-    test_duplicates.set(2**32, 1)
-    assert test_duplicates.get(999_999_999) == 1
-    assert test_duplicates.get(1_000_000_000) == 1
-    assert test_duplicates.get(2**32) == 1
+    def __len__(self) -> int:
+        """
+        Return the number of entries in the cache.
+        """
+        return len(self.cache)
 
-    test_big = LRU_Cache(1_000_000)
-    for i in range(0, 1_000_000):
-        test_big.set(i, i)
-    
-    for i in range(0, 1_000_000):
-        assert test_big.get(i) == i
+    def _touch(self, node: LFUNode) -> None:
+        """
+        Move a node from its count's list to the head of the next count's list.
+        """
+        bucket = self.buckets[node.count]
+        bucket.remove(node)
+        if bucket.head is None:
+            del self.buckets[node.count]
+            if self.min_count == node.count:
+                self.min_count += 1
+        node.count += 1
+        bucket = self.buckets.get(node.count)
+        if bucket is None:
+            bucket = self.buckets[node.count] = LinkedList()
+        bucket.push_front(node)
+
+    def get(self, key: int) -> int:
+        """
+        Get the value of the key if the key exists in the cache, otherwise return -1.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be accessed in the cache.
+
+        Returns:
+        --------
+        int
+            The value associated with the key if it exists, otherwise -1.
+
+        >>> cache = LFUCache(2)
+        >>> cache.set(1, 1); cache.set(2, 2)
+        >>> cache.get(1)
+        1
+        >>> cache.set(3, 3)  # evicts 2, used less often than 1
+        >>> cache.get(2), cache.get(3)
+        (-1, 3)
+        """
+        node = self.cache.get(key)
+        if node is None:
+            return -1
+        self._touch(node)
+        return node.value
+
+    def set(self, key: int, value: int) -> None:
+        """
+        Set or insert the value of a key. When the cache is full, the least
+        frequently used key is evicted, the least recently used one among ties.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be inserted or updated in the cache.
+        value : int
+            The value to be associated with the key, must be positive.
+        """
+        assert isinstance(key, int), "Invalid key input type"
+        assert isinstance(value, int), "Invalid value input type"
+        assert value >= 0, "Negative values reserved for missing keys"
+        self._put(key, value)
+
+    def _put(self, key: int, value: int) -> None:
+        """
+        Insert or update a key without validating it.
+        """
+        node = self.cache.get(key)
+        if node is not None:
+            node.value = value
+            self._touch(node)
+            return
+
+        if len(self.cache) >= self.capacity:
+            bucket = self.buckets[self.min_count]
+            victim = bucket.tail
+            assert victim
+            bucket.remove(victim)
+            if bucket.head is None:
+                del self.buckets[self.min_count]
+            del self.cache[victim.key]
+
+        node = LFUNode(value, key)
+        self.cache[key] = node
+        bucket = self.buckets.get(1)
+        if bucket is None:
+            bucket = self.buckets[1] = LinkedList()
+        bucket.push_front(node)
+        self.min_count = 1
+
+
+# Odd multipliers giving each FrequencySketch row an independent hash.
+_SKETCH_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+_HALVE = bytes(i >> 1 for i in range(256))
+
+
+class FrequencySketch:
+    """
+    A count-min sketch of 4-bit counters that estimates how often keys were seen.
+
+    After a sample of ten increments per counted slot, every counter is halved so
+    old popularity fades and the sketch tracks recent frequency.
+
+    Attributes:
+    -----------
+    width : int
+        The number of counters per row, a power of two.
+    sample_size : int
+        The number of increments between two halvings.
+    additions : int
+        The increments recorded since the last halving.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Constructs all the necessary attributes for the FrequencySketch object.
+
+        Parameters:
+        -----------
+        capacity : int
+            The number of keys the sketch should track with few collisions.
+        """
+        self.width: int = 1 << max(4, (capacity - 1).bit_length())
+        self.sample_size: int = 10 * capacity
+        self.additions: int = 0
+        self._shift: int = 64 - (self.width.bit_length() - 1)
+        self._rows: list[bytearray] = [bytearray(self.width) for _ in _SKETCH_SEEDS]
+
+    def _indexes(self, key: int) -> list[int]:
+        """
+        Return the counter index of key in each row.
+        """
+        h = hash(key)
+        shift = self._shift
+        return [((h * seed) & 0xFFFFFFFFFFFFFFFF) >> shift for seed in _SKETCH_SEEDS]
+
+    def increment(self, key: int) -> None:
+        """
+        Record one occurrence of key, halving every counter once the sample is full.
+
+        >>> sketch = FrequencySketch(16)
+        >>> for _ in range(3):
+        ...     sketch.increment(5)
+        >>> sketch.estimate(5), sketch.estimate(6)
+        (3, 0)
+        """
+        for row, i in zip(self._rows, self._indexes(key)):
+            if row[i] < 15:
+                row[i] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.reset()
+
+    def estimate(self, key: int) -> int:
+        """
+        Return an upper bound on how often key was seen recently, at most 15.
+        """
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+
+    def reset(self) -> None:
+        """
+        Halve every counter, ageing out old frequency.
+
+        >>> sketch = FrequencySketch(16)
+        >>> for _ in range(6):
+        ...     sketch.increment(1)
+        >>> sketch.reset()
+        >>> sketch.estimate(1), sketch.additions
+        (3, 3)
+        """
+        self._rows = [row.translate(_HALVE) for row in self._rows]
+        self.additions //= 2
+
+
+class TinyLFUCache(LRU_Cache):
+    """
+    An LRU cache with a TinyLFU admission filter in front of it.
+
+    Every get and set is recorded in a FrequencySketch. When the cache is full a
+    new key is only admitted if it has been seen more often than the least
+    recently used key it would evict, so a scan of one-hit wonders cannot flush
+    the working set.
+
+    Attributes:
+    -----------
+    sketch : FrequencySketch
+        The recent access frequency of keys, resident or not.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Constructs all the necessary attributes for the TinyLFUCache object.
+
+        Parameters:
+        -----------
+        capacity : int
+            The maximum number of items the cache can hold.
+        """
+        super().__init__(capacity)
+        self.sketch: FrequencySketch = FrequencySketch(capacity)
+
+    def get(self, key: int) -> int:
+        """
+        Get the value of the key if the key exists in the cache, otherwise return -1.
+
+        The access is recorded whether or not it hits.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be accessed in the cache.
+
+        Returns:
+        --------
+        int
+            The value associated with the key if it exists, otherwise -1.
+        """
+        self.sketch.increment(key)
+        return super().get(key)
+
+    def _put(self, key: int, value: int) -> None:
+        """
+        Record the access, then insert or update the key if the admission filter
+        prefers it to the eviction victim.
+
+        >>> cache = TinyLFUCache(1)
+        >>> cache.set(1, 1); _ = cache.get(1)
+        >>> cache.set(2, 2)  # seen once, less than key 1: rejected
+        >>> cache.get(1), len(cache)
+        (1, 1)
+        """
+        self.sketch.increment(key)
+        if key not in self.cache and len(self.cache) >= self.capacity:
+            victim = self.data.tail
+            assert victim
+            if self.sketch.estimate(key) <= self.sketch.estimate(victim.key):
+                return
+        super()._put(key, value)
+
+
+# Indexes of the ARCCache lists: recent and frequent residents, and their ghosts.
+_T1, _T2, _B1, _B2 = 0, 1, 2, 3
+
+
+class ARCNode(Node):
+    """
+    A linked list node that remembers which ARCCache list holds it.
+
+    Attributes:
+    -----------
+    where : int
+        The index of the list the node is in: T1, T2, B1 or B2.
+    """
+
+    __slots__ = ("where",)
+
+    def __init__(self, value: int, key: Optional[int] = None) -> None:
+        """
+        Constructs a node for a key entering T1.
+        """
+        super().__init__(value, key)
+        self.where: int = _T1
+
+
+class ARCCache:
+    """
+    An Adaptive Replacement Cache (ARC).
+
+    Resident keys are split between T1, seen once recently, and T2, seen at least
+    twice. The ghost lists B1 and B2 remember only the keys recently evicted from
+    each. A hit in a ghost list shows which side was evicted too eagerly and moves
+    the target size p of T1 toward it, so the cache adapts between recency and
+    frequency and resists scans.
+
+    Attributes:
+    -----------
+    capacity : int
+        The maximum number of items the cache can hold.
+    p : float
+        The target size of T1.
+    cache : dict[int, ARCNode]
+        The dictionary from key to its node, resident or ghost.
+    lists : list[LinkedList]
+        The T1, T2, B1 and B2 lists, most recently used at the head.
+    sizes : list[int]
+        The length of each list.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Constructs all the necessary attributes for the ARCCache object.
+
+        Parameters:
+        -----------
+        capacity : int
+            The maximum number of items the cache can hold.
+        """
+        assert capacity > 0, "Capacity must be positive"
+        self.capacity: int = capacity
+        self.p: float = 0.0
+        self.cache: dict[int, ARCNode] = {}
+        self.lists: list[LinkedList] = [LinkedList() for _ in range(4)]
+        self.sizes: list[int] = [0, 0, 0, 0]
+
+    def __len__(self) -> int:
+        """
+        Return the number of resident entries in the cache.
+        """
+        return self.sizes[_T1] + self.sizes[_T2]
+
+    def _move(self, node: ARCNode, where: int) -> None:
+        """
+        Move a node from its current list to the head of another.
+        """
+        self.lists[node.where].remove(node)
+        self.sizes[node.where] -= 1
+        self.lists[where].push_front(node)
+        self.sizes[where] += 1
+        node.where = where
+
+    def _drop_lru(self, where: int) -> None:
+        """
+        Forget the least recently used key of a list entirely.
+        """
+        node = self.lists[where].tail
+        assert node
+        self.lists[where].remove(node)
+        self.sizes[where] -= 1
+        del self.cache[node.key]
+
+    def _replace(self, in_b2: bool) -> None:
+        """
+        Evict the least recently used resident of T1 or T2 into its ghost list.
+        """
+        t1 = self.sizes[_T1]
+        if t1 and (t1 > self.p or (in_b2 and t1 == self.p)):
+            victim, ghost = self.lists[_T1].tail, _B1
+        else:
+            victim, ghost = self.lists[_T2].tail, _B2
+        assert victim
+        self._move(victim, ghost)
+        victim.value = -1
+
+    def get(self, key: int) -> int:
+        """
+        Get the value of the key if the key exists in the cache, otherwise return -1.
+
+        A hit promotes the key to the head of T2.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be accessed in the cache.
+
+        Returns:
+        --------
+        int
+            The value associated with the key if it exists, otherwise -1.
+
+        >>> cache = ARCCache(2)
+        >>> cache.set(1, 1); cache.set(2, 2)
+        >>> cache.get(1)
+        1
+        >>> cache.set(3, 3)  # evicts 2 from T1, keeping the reused key 1
+        >>> cache.get(1), cache.get(2), cache.get(3)
+        (1, -1, 3)
+        """
+        node = self.cache.get(key)
+        if node is None or node.where >= _B1:
+            return -1
+        self._move(node, _T2)
+        return node.value
+
+    def set(self, key: int, value: int) -> None:
+        """
+        Set or insert the value of a key, adapting the T1 target when the key is
+        found in a ghost list and evicting a resident when the cache is full.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be inserted or updated in the cache.
+        value : int
+            The value to be associated with the key, must be positive.
+        """
+        assert isinstance(key, int), "Invalid key input type"
+        assert isinstance(value, int), "Invalid value input type"
+        assert value >= 0, "Negative values reserved for missing keys"
+        self._put(key, value)
+
+    def _put(self, key: int, value: int) -> None:
+        """
+        Insert or update a key without validating it.
+        """
+        sizes = self.sizes
+        capacity = self.capacity
+        node = self.cache.get(key)
+        if node is not None:
+            if node.where == _B1:
+                self.p = min(capacity, self.p + max(sizes[_B2] / sizes[_B1], 1))
+                self._replace(False)
+            elif node.where == _B2:
+                self.p = max(0, self.p - max(sizes[_B1] / sizes[_B2], 1))
+                self._replace(True)
+            node.value = value
+            self._move(node, _T2)
+            return
+
+        if sizes[_T1] + sizes[_B1] == capacity:
+            if sizes[_T1] < capacity:
+                self._drop_lru(_B1)
+                self._replace(False)
+            else:
+                self._drop_lru(_T1)
+        elif sum(sizes) >= capacity:
+            if sum(sizes) >= 2 * capacity:
+                self._drop_lru(_B2)
+            if sizes[_T1] + sizes[_T2] >= capacity:
+                self._replace(False)
+
+        node = ARCNode(value, key)
+        self.cache[key] = node
+        self.lists[_T1].push_front(node)
+        sizes[_T1] += 1
+
+
+# Eviction policies by name. Each takes a capacity and has the LRU_Cache
+# get/set interface, so any of them can back a ShardedLRUCache or AsyncLRUCache.
+POLICIES: dict[str, Callable[[int], Any]] = {
+    "lru": LRU_Cache,
+    "lfu": LFUCache,
+    "tinylfu": TinyLFUCache,
+    "arc": ARCCache,
+}
+
+
+class TTLNode(Node):
+    """
+    A linked list node that also records when its entry expires and what it weighs.
+
+    Attributes:
+    -----------
+    expires : float
+        The clock time after which the entry is stale, or infinity.
+    weight : int
+        The entry's share of the cache capacity.
+    """
+
+    __slots__ = ("expires", "weight")
+
+    def __init__(self, value: Any, key: int, expires: float, weight: int) -> None:
+        """
+        Constructs a node for an entry with the given expiry time and weight.
+        """
+        super().__init__(value, key)
+        self.expires: float = expires
+        self.weight: int = weight
+
+
+# Expired entries removed by the sweep that runs on every set().
+_SWEEP_BATCH = 4
+
+
+class TTLCache(LRU_Cache):
+    """
+    An LRU cache whose entries can expire and whose capacity can be a total weight.
+
+    Each entry may have a time to live. A stale entry is dropped when it is read,
+    and every set() also sweeps a few expired entries off a heap ordered by expiry
+    time, so stale entries do not hold on to capacity. expire() sweeps them all,
+    e.g. from a timer.
+
+    With a weigher, capacity bounds the sum of the entry weights (for instance
+    bytes) instead of the number of entries, and least recently used entries are
+    evicted until a new entry fits. Values can be of any type.
+
+    Attributes:
+    -----------
+    ttl : Optional[float]
+        The default time to live in seconds, or None for no expiry.
+    weigher : Optional[Callable[[Any], int]]
+        The function giving the weight of a value; every entry weighs 1 without it.
+    clock : Callable[[], float]
+        The source of the current time.
+    weight : int
+        The total weight of the entries in the cache.
+    expiry : list[tuple[float, int, TTLNode]]
+        A heap of expiry times; entries for replaced nodes are skipped when popped.
+    """
+
+    def __init__(self, capacity: int, ttl: Optional[float] = None,
+                 weigher: Optional[Callable[[Any], int]] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Constructs all the necessary attributes for the TTLCache object.
+
+        Parameters:
+        -----------
+        capacity : int
+            The maximum number of items, or the maximum total weight with a weigher.
+        ttl : Optional[float]
+            The default time to live in seconds of an entry, or None for no expiry.
+        weigher : Optional[Callable[[Any], int]]
+            The function giving the non-negative weight of a value, e.g. len.
+        clock : Callable[[], float]
+            The source of the current time in seconds.
+        """
+        super().__init__(capacity)
+        assert ttl is None or ttl > 0, "TTL must be positive"
+        self.ttl: Optional[float] = ttl
+        self.weigher: Optional[Callable[[Any], int]] = weigher
+        self.clock: Callable[[], float] = clock
+        self.weight: int = 0
+        self.expiry: list[tuple[float, int, TTLNode]] = []
+        self._pushes: int = 0
+
+    def get(self, key: int) -> Any:
+        """
+        Get the value of the key if it exists and has not expired, otherwise return -1.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be accessed in the cache.
+
+        Returns:
+        --------
+        Any
+            The value associated with the key if it is live, otherwise -1.
+
+        >>> now = [0.0]
+        >>> cache = TTLCache(2, ttl=10, clock=lambda: now[0])
+        >>> cache.set(1, "a")
+        >>> cache.get(1)
+        'a'
+        >>> now[0] = 10.0
+        >>> cache.get(1), len(cache)
+        (-1, 0)
+        """
+        node = self.cache.get(key)
+        if node is None:
+            return -1
+        if node.expires <= self.clock():
+            self._discard(node)
+            return -1
+        self.data.move_to_front(node)
+        return node.value
+
+    def set(self, key: int, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Set or insert the value of a key, evicting least recently used entries until
+        it fits. A value heavier than the whole capacity is not stored.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be inserted or updated in the cache.
+        value : Any
+            The value to be associated with the key.
+        ttl : Optional[float]
+            The time to live of this entry in seconds, instead of the default.
+
+        >>> cache = TTLCache(10, weigher=len)
+        >>> cache.set(1, "abcd"); cache.set(2, "efgh"); cache.set(3, "ij")
+        >>> cache.set(4, "klm")  # 13 units: evicts key 1
+        >>> cache.get(1), cache.weight
+        (-1, 9)
+        """
+        assert isinstance(key, int), "Invalid key input type"
+        assert ttl is None or ttl > 0, "TTL must be positive"
+        now = self.clock()
+        ttl = self.ttl if ttl is None else ttl
+        expires = now + ttl if ttl is not None else float("inf")
+        self._sweep(now, _SWEEP_BATCH)
+        self._put_entry(key, value, expires)
+
+    def _put(self, key: int, value: Any) -> None:
+        """
+        Insert or update a key with the default time to live.
+        """
+        ttl = self.ttl
+        self._put_entry(key, value, self.clock() + ttl if ttl is not None else float("inf"))
+
+    def _put_entry(self, key: int, value: Any, expires: float) -> None:
+        """
+        Store an entry with the given expiry time, evicting to make room for its weight.
+        """
+        weight = self.weigher(value) if self.weigher is not None else 1
+        assert weight >= 0, "Weight must not be negative"
+        old = self.cache.get(key)
+        if old is not None:
+            self._discard(old)
+        if weight > self.capacity:
+            return
+
+        while self.weight + weight > self.capacity:
+            tail = self.data.tail
+            assert tail
+            self._discard(tail)
+
+        node = TTLNode(value, key, expires, weight)
+        self.data.push_front(node)
+        self.cache[key] = node
+        self.weight += weight
+        if expires != float("inf"):
+            self._pushes += 1
+            heapq.heappush(self.expiry, (expires, self._pushes, node))
+            if len(self.expiry) > 2 * len(self.cache) + 16:
+                self._compact()
+
+    def _discard(self, node: TTLNode) -> None:
+        """
+        Remove a node from the cache and give back its weight.
+        """
+        self.data.remove(node)
+        del self.cache[node.key]
+        self.weight -= node.weight
+
+    def _sweep(self, now: float, limit: Optional[int] = None) -> int:
+        """
+        Remove up to limit expired entries, soonest expiry first.
+        """
+        removed = 0
+        expiry = self.expiry
+        cache = self.cache
+        while expiry and expiry[0][0] <= now and (limit is None or removed < limit):
+            _, _, node = heapq.heappop(expiry)
+            if cache.get(node.key) is node:
+                self._discard(node)
+                removed += 1
+        return removed
+
+    def _compact(self) -> None:
+        """
+        Rebuild the expiry heap without the entries of replaced or evicted nodes.
+        """
+        cache = self.cache
+        self.expiry = [item for item in self.expiry if cache.get(item[2].key) is item[2]]
+        heapq.heapify(self.expiry)
+
+    def expire(self) -> int:
+        """
+        Remove every expired entry and return how many were removed.
+
+        >>> now = [0.0]
+        >>> cache = TTLCache(4, clock=lambda: now[0])
+        >>> cache.set(1, 1, ttl=5); cache.set(2, 2, ttl=50); cache.set(3, 3)
+        >>> now[0] = 20.0
+        >>> cache.expire(), sorted(cache.cache)
+        (1, [2, 3])
+        """
+        return self._sweep(self.clock())
+
+
+# Separates positional arguments from keyword-only ones in a memoize key.
+_KWARGS_MARK = object()
+_POSITIONAL = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
+
+def memoize(maxsize: int = 128) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorate a function so its results are kept in an LRU_Cache of maxsize entries.
+
+    Arguments must be hashable; return values can be anything. Calls are
+    normalized against the function's signature, so f(1, 2), f(1, b=2),
+    f(b=2, a=1) and, when b defaults to 2, f(1) share one entry. The cache engine
+    is used directly, bypassing the int-only checks of LRU_Cache.set.
+
+    The wrapper has a stats attribute (a CacheStats without timing),
+    cache_info() returning its snapshot with the current size, and cache_clear().
+
+    Parameters:
+    -----------
+    maxsize : int
+        The maximum number of results to keep.
+
+    >>> @memoize(maxsize=2)
+    ... def add(a, b=2):
+    ...     return [a + b]
+    >>> add(1), add(1, 2), add(b=2, a=1)
+    ([3], [3], [3])
+    >>> info = add.cache_info()
+    >>> info["hits"], info["misses"], info["size"]
+    (2, 1, 1)
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        cache = LRU_Cache(maxsize)
+        stats = CacheStats(timing=False)
+        nodes = cache.cache
+        move_to_front = cache.data.move_to_front
+        put = cache._put
+        signature = inspect.signature(func)
+        params = signature.parameters.values()
+        simple = all(p.kind in _POSITIONAL for p in params)
+        arity = len(params)
+        names = [p.name for p in params]
+        defaults = {p.name: p.default for p in params if p.default is not p.empty}
+
+        def make_key(args: tuple, kwargs: dict[str, Any]) -> tuple:
+            if simple and len(args) <= arity:
+                if not kwargs and len(args) == arity:
+                    return args
+                # Bind by hand; anything unusual falls through to signature.bind.
+                key = list(args)
+                used = 0
+                for name in names[len(args):]:
+                    if name in kwargs:
+                        key.append(kwargs[name])
+                        used += 1
+                    elif name in defaults:
+                        key.append(defaults[name])
+                    else:
+                        break
+                else:
+                    if used == len(kwargs):
+                        return tuple(key)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if bound.kwargs:
+                return bound.args + (_KWARGS_MARK,) + tuple(sorted(bound.kwargs.items()))
+            return bound.args
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = make_key(args, kwargs)
+            node = nodes.get(key)
+            if node is not None:
+                move_to_front(node)
+                stats.hits += 1
+                return node.value
+            stats.misses += 1
+            value = func(*args, **kwargs)
+            before = len(nodes) + (key not in nodes)
+            put(key, value)
+            stats.sets += 1
+            stats.evictions += before - len(nodes)
+            return value
+
+        def cache_info() -> dict[str, Any]:
+            info = stats.snapshot()
+            info["size"] = len(nodes)
+            info["maxsize"] = maxsize
+            return info
+
+        def cache_clear() -> None:
+            nodes.clear()
+            cache.data.head = cache.data.tail = None
+            stats.reset()
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        wrapper.stats = stats  # type: ignore[attr-defined]
+        wrapper.cache_info = cache_info  # type: ignore[attr-defined]
+        wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
+        return wrapper
+    return decorator
+
+
+# Word offsets of the header that precedes the slot arrays in ArrayLRUCache.
+# The last three are only used by MappedLRUCache.
+_HEAD, _TAIL, _SIZE, _FREE = 0, 1, 2, 3
+_MAGIC, _CAPACITY, _DIRTY = 4, 5, 6
+_HEADER_WORDS = 8
+_NIL = -1
+# prev, next and the hash table hold slot + 1 in int32 words
+_MAX_SLOTS = 2**31 - 2
+_INT64_MIN, _INT64_MAX = -2**63, 2**63 - 1
+
+
+def _table_size(capacity: int) -> int:
+    """
+    Return the hash table size for a capacity: the smallest power of two that keeps
+    the load factor at or below 2/3, so linear probing stays short.
+
+    >>> _table_size(1024), _table_size(1365), _table_size(1366)
+    (2048, 2048, 4096)
+    """
+    return 1 << ((3 * capacity + 1) // 2 - 1).bit_length()
+
+
+class ArrayLRUCache:
+    """
+    An LRU cache for int keys and values that keeps every entry in preallocated
+    array slots instead of Python objects.
+
+    The storage is a single flat run of int64 words: a small header (head, tail,
+    size and free-list pointers) followed by the int64 key and value arrays, the
+    int32 prev and next arrays with one slot per entry, and an int32
+    open-addressing hash table that maps a key to its slot. Free slots are
+    chained through the next array and evicted slots are returned to that free
+    list, so nothing is allocated after construction.
+
+    Attributes:
+    -----------
+    capacity : int
+        The maximum number of items the cache can hold.
+    table_size : int
+        The number of hash table buckets, a power of two at least 1.5 times the capacity.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Constructs all the necessary attributes for the ArrayLRUCache object.
+
+        Parameters:
+        -----------
+        capacity : int
+            The maximum number of items the cache can hold.
+        """
+        assert 0 < capacity <= _MAX_SLOTS, "Capacity must be positive and fit int32 slots"
+        self.capacity: int = capacity
+        self.table_size: int = _table_size(capacity)
+        self._storage = array('q', bytes(8 * self.words_needed(capacity)))
+        self._bind(memoryview(self._storage))
+        self._clear()
+
+    @classmethod
+    def from_buffer(cls, words: memoryview, capacity: int, clear: bool = True) -> "ArrayLRUCache":
+        """
+        Build a cache over existing int64 storage instead of allocating its own.
+
+        Parameters:
+        -----------
+        words : memoryview
+            At least words_needed(capacity) int64 words, e.g. in shared memory.
+        capacity : int
+            The maximum number of items the cache can hold.
+        clear : bool
+            Whether to empty the storage, or use the cache already laid out in it.
+
+        >>> words = memoryview(array('q', bytes(8 * ArrayLRUCache.words_needed(2))))
+        >>> ArrayLRUCache.from_buffer(words, 2).set(1, 5)
+        >>> ArrayLRUCache.from_buffer(words, 2, clear=False).get(1)
+        5
+        """
+        assert 0 < capacity <= _MAX_SLOTS, "Capacity must be positive and fit int32 slots"
+        cache = cls.__new__(cls)
+        cache.capacity = capacity
+        cache.table_size = _table_size(capacity)
+        cache._bind(words)
+        if clear:
+            cache._clear()
+        return cache
+
+    @staticmethod
+    def words_needed(capacity: int) -> int:
+        """
+        Return the number of int64 words of storage a cache of the given capacity uses.
+
+        >>> ArrayLRUCache.words_needed(3)
+        21
+        """
+        table_size = _table_size(capacity)
+        # Keys and values take a word each, prev, next and every bucket half a word
+        return _HEADER_WORDS + 3 * capacity + table_size // 2
+
+    def _bind(self, words: memoryview) -> None:
+        """
+        Slice the flat int64 storage into the header, slot arrays and hash table.
+        """
+        cap = self.capacity
+        start = _HEADER_WORDS
+        self._meta = words[:_HEADER_WORDS]
+        self._keys = words[start:start + cap]
+        self._values = words[start + cap:start + 2 * cap]
+        # The int64 arrays come first, so the int32 ones start on a word boundary
+        self._raw = words.cast('B')
+        offset = 8 * (start + 2 * cap)
+        self._prev = self._raw[offset:offset + 4 * cap].cast('i')
+        self._next = self._raw[offset + 4 * cap:offset + 8 * cap].cast('i')
+        self._table = self._raw[offset + 8 * cap:offset + 8 * cap + 4 * self.table_size].cast('i')
+        self._mask = self.table_size - 1
+        self._shift = 64 - (self.table_size.bit_length() - 1)
+
+    def _clear(self) -> None:
+        """
+        Empty the cache and chain every slot onto the free list.
+        """
+        meta = self._meta
+        meta[_HEAD] = _NIL
+        meta[_TAIL] = _NIL
+        meta[_SIZE] = 0
+        meta[_FREE] = 0
+        nxt = self._next
+        for slot in range(self.capacity - 1):
+            nxt[slot] = slot + 1
+        nxt[self.capacity - 1] = _NIL
+        table = self._table
+        for i in range(self.table_size):
+            table[i] = 0
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries in the cache.
+        """
+        return self._meta[_SIZE]
+
+    def memory_per_entry(self) -> float:
+        """
+        Return the bytes of storage used per entry at full capacity.
+
+        >>> ArrayLRUCache(1024).memory_per_entry()
+        32.0625
+        """
+        return self._meta.nbytes / self.capacity + 24 + 4 * self.table_size / self.capacity
+
+    def _bucket(self, key: int) -> int:
+        """
+        Return the home bucket of a key using Fibonacci hashing.
+        """
+        return ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> self._shift
+
+    def _find(self, key: int) -> int:
+        """
+        Return the slot holding key, or -1 if it is not in the cache.
+        """
+        table = self._table
+        keys = self._keys
+        mask = self._mask
+        i = ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> self._shift
+        while True:
+            entry = table[i]
+            if entry == 0:
+                return _NIL
+            if keys[entry - 1] == key:
+                return entry - 1
+            i = (i + 1) & mask
+
+    def _index(self, key: int, slot: int) -> None:
+        """
+        Record slot as the home of key in the first free bucket of its probe sequence.
+        """
+        table = self._table
+        mask = self._mask
+        i = self._bucket(key)
+        while table[i] != 0:
+            i = (i + 1) & mask
+        table[i] = slot + 1
+
+    def _unindex(self, key: int) -> None:
+        """
+        Remove key from the hash table, shifting later entries of its probe run back
+        so lookups never need tombstones.
+        """
+        table = self._table
+        keys = self._keys
+        mask = self._mask
+        i = self._bucket(key)
+        while keys[table[i] - 1] != key:
+            i = (i + 1) & mask
+        table[i] = 0
+        j = i
+        while True:
+            j = (j + 1) & mask
+            entry = table[j]
+            if entry == 0:
+                return
+            home = self._bucket(keys[entry - 1])
+            # Leave the entry alone if its home lies cyclically in (i, j].
+            if (i < j and i < home <= j) or (j < i and (home > i or home <= j)):
+                continue
+            table[i] = entry
+            table[j] = 0
+            i = j
+
+    def _unlink(self, slot: int) -> None:
+        """
+        Detach a slot from the recency list.
+        """
+        meta, prev, nxt = self._meta, self._prev, self._next
+        p = prev[slot]
+        n = nxt[slot]
+        if p == _NIL:
+            meta[_HEAD] = n
+        else:
+            nxt[p] = n
+        if n == _NIL:
+            meta[_TAIL] = p
+        else:
+            prev[n] = p
+
+    def _push_front(self, slot: int) -> None:
+        """
+        Link a detached slot in as the most recently used entry.
+        """
+        meta, prev, nxt = self._meta, self._prev, self._next
+        head = meta[_HEAD]
+        prev[slot] = _NIL
+        nxt[slot] = head
+        if head == _NIL:
+            meta[_TAIL] = slot
+        else:
+            prev[head] = slot
+        meta[_HEAD] = slot
+
+    def _move_to_front(self, slot: int) -> None:
+        """
+        Make a linked slot the most recently used entry.
+        """
+        if self._prev[slot] != _NIL:
+            self._unlink(slot)
+            self._push_front(slot)
+
+    def get(self, key: int) -> int:
+        """
+        Get the value of the key if the key exists in the cache, otherwise return -1.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be accessed in the cache.
+
+        Returns:
+        --------
+        int
+            The value associated with the key if it exists, otherwise -1.
+
+        >>> cache = ArrayLRUCache(2)
+        >>> cache.set(1, 10)
+        >>> cache.get(1), cache.get(2)
+        (10, -1)
+        """
+        slot = self._find(key)
+        if slot == _NIL:
+            return -1
+        self._move_to_front(slot)
+        return self._values[slot]
+
+    def set(self, key: int, value: int) -> None:
+        """
+        Set or insert the value of a key, evicting the least recently used entry and
+        returning its slot to the free list when the cache is full.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be inserted or updated, must fit in a signed 64-bit integer.
+        value : int
+            The value to be associated with the key, must be positive and fit in a
+            signed 64-bit integer.
+
+        >>> cache = ArrayLRUCache(2)
+        >>> for k in range(3):
+        ...     cache.set(k, k)
+        >>> cache.get(0), cache.get(1), cache.get(2), len(cache)
+        (-1, 1, 2, 2)
+        """
+        assert isinstance(key, int), "Invalid key input type"
+        assert isinstance(value, int), "Invalid value input type"
+        assert value >= 0, "Negative values reserved for missing keys"
+        assert _INT64_MIN <= key <= _INT64_MAX and value <= _INT64_MAX, "Value out of int64 range"
+        self._put(key, value)
+
+    def _put(self, key: int, value: int) -> None:
+        """
+        Insert or update a key without validating it.
+        """
+        slot = self._find(key)
+        if slot != _NIL:
+            self._values[slot] = value
+            self._move_to_front(slot)
+            return
+
+        meta = self._meta
+        if meta[_SIZE] >= self.capacity:
+            self._evict()
+        slot = meta[_FREE]
+        meta[_FREE] = self._next[slot]
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._push_front(slot)
+        self._index(key, slot)
+        meta[_SIZE] += 1
+
+    def _evict(self) -> None:
+        """
+        Drop the least recently used entry and put its slot on the free list.
+        """
+        meta = self._meta
+        slot = meta[_TAIL]
+        self._unlink(slot)
+        self._unindex(self._keys[slot])
+        self._next[slot] = meta[_FREE]
+        meta[_FREE] = slot
+        meta[_SIZE] -= 1
+
+    def keys(self) -> list[int]:
+        """
+        Return the keys from most to least recently used.
+
+        >>> cache = ArrayLRUCache(3)
+        >>> for k in (1, 2, 3):
+        ...     cache.set(k, k)
+        >>> _ = cache.get(1)
+        >>> cache.keys()
+        [1, 3, 2]
+        """
+        result: list[int] = []
+        slot = self._meta[_HEAD]
+        while slot != _NIL:
+            result.append(self._keys[slot])
+            slot = self._next[slot]
+        return result
+
+
+# Identifies a MappedLRUCache file, written as the _MAGIC header word.
+_FILE_MAGIC = int.from_bytes(b"LRUSLT32", "little")
+
+
+class MappedLRUCache(ArrayLRUCache):
+    """
+    An ArrayLRUCache whose slots live in a memory-mapped file, so a new process
+    can reopen the file and serve warm hits straight away.
+
+    The file holds exactly the storage of ArrayLRUCache: the header (with a magic
+    number, the capacity and a dirty flag in its spare words), the slot arrays
+    and the hash table. Every mutation raises the dirty flag first and lowers it
+    last. If a process dies in between, the next open finds the flag raised and
+    rebuilds a consistent cache from the slots that the hash table points to,
+    keeping their recency order as far as the list is intact. Entries are only
+    indexed after their key and value are written and are unindexed before their
+    slot is reused, so a rebuilt entry never pairs a key with a stale value. A
+    new file gets its header, flagged dirty, before its slots, so the next open
+    also finishes a file whose creation was interrupted.
+
+    The operating system writes the mapped pages back on its own; flush() forces
+    them to disk, for durability across a machine crash as well.
+
+    Attributes:
+    -----------
+    path : str
+        The file backing the cache.
+    recovered : bool
+        Whether the file had to be rebuilt when it was opened.
+    """
+
+    def __init__(self, path: str, capacity: Optional[int] = None) -> None:
+        """
+        Open the cache file at path, creating it if it does not exist.
+
+        Parameters:
+        -----------
+        path : str
+            The file backing the cache.
+        capacity : Optional[int]
+            The maximum number of items. Required to create the file; when opening
+            an existing file it must match the stored capacity or be None.
+        """
+        assert capacity is None or 0 < capacity <= _MAX_SLOTS, "Capacity must be positive and fit int32 slots"
+        self.path: str = path
+        self.recovered: bool = False
+        self._file = open(path, "a+b")
+        try:
+            self._open(capacity)
+        except BaseException:
+            self._file.close()
+            raise
+
+    def _open(self, capacity: Optional[int]) -> None:
+        """
+        Validate or create the file header, then map the file and bind the slots.
+        """
+        self._file.seek(0, os.SEEK_END)
+        size = self._file.tell()
+        fresh = size == 0
+        if fresh:
+            assert capacity is not None, "Capacity is required to create the file"
+            # The header goes in first, flagged dirty, so a crash before the
+            # slots are laid out leaves a file the next open can finish
+            header = array('q', bytes(8 * _HEADER_WORDS))
+            header[_MAGIC] = _FILE_MAGIC
+            header[_CAPACITY] = capacity
+            header[_DIRTY] = 1
+            self._file.write(header.tobytes())
+            self._file.flush()
+            size = len(header) * 8
+        else:
+            assert size >= 8 * _HEADER_WORDS, "Not a MappedLRUCache file"
+            header = array('q')
+            self._file.seek(0)
+            header.frombytes(self._file.read(8 * _HEADER_WORDS))
+            assert header[_MAGIC] == _FILE_MAGIC, "Not a MappedLRUCache file"
+            assert 0 < header[_CAPACITY] <= _MAX_SLOTS, "Not a MappedLRUCache file"
+            assert capacity is None or capacity == header[_CAPACITY], "Capacity does not match the file"
+            capacity = header[_CAPACITY]
+        expected = 8 * self.words_needed(capacity)
+        if size != expected:
+            # Only a file whose creation was cut short holds just the header
+            assert size == 8 * _HEADER_WORDS and header[_DIRTY], "Truncated MappedLRUCache file"
+            self._file.truncate(expected)
+
+        self.capacity: int = capacity
+        self.table_size: int = _table_size(capacity)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._words = memoryview(self._mmap).cast('q')
+        self._bind(self._words)
+        if fresh:
+            self._clear()
+            self._meta[_DIRTY] = 0
+        elif self._meta[_DIRTY]:
+            self._recover()
+            self.recovered = True
+
+    def _move_to_front(self, slot: int) -> None:
+        """
+        Make a linked slot the most recently used entry, marking the file dirty meanwhile.
+        """
+        if self._prev[slot] != _NIL:
+            meta = self._meta
+            meta[_DIRTY] = 1
+            self._unlink(slot)
+            self._push_front(slot)
+            meta[_DIRTY] = 0
+
+    def _put(self, key: int, value: int) -> None:
+        """
+        Insert or update a key, marking the file dirty meanwhile.
+        """
+        meta = self._meta
+        meta[_DIRTY] = 1
+        super()._put(key, value)
+        meta[_DIRTY] = 0
+
+    def _recover(self) -> None:
+        """
+        Rebuild the list, free list and hash table from the indexed slots.
+        """
+        cap = self.capacity
+        keys = self._keys
+        live = set()
+        for entry in self._table:
+            if entry > 0 and entry <= cap:
+                live.add(entry - 1)
+
+        order: list[int] = []
+        seen = set()
+        slot = self._meta[_HEAD]
+        while 0 <= slot < cap and slot in live and slot not in seen:
+            order.append(slot)
+            seen.add(slot)
+            slot = self._next[slot]
+        order.extend(slot for slot in sorted(live) if slot not in seen)
+        entries = [(keys[slot], self._values[slot]) for slot in order]
+
+        self._clear()
+        for key, value in reversed(entries):
+            if self._find(key) == _NIL:
+                ArrayLRUCache._put(self, key, value)
+        self._meta[_DIRTY] = 0
+
+    def flush(self) -> None:
+        """
+        Write the mapped pages back to the file.
+        """
+        self._mmap.flush()
+
+    def close(self) -> None:
+        """
+        Flush and unmap the cache file. The object cannot be used afterwards.
+        """
+        if self._mmap.closed:
+            return
+        self.flush()
+        for view in (self._meta, self._prev, self._next, self._keys, self._values,
+                     self._table, self._raw, self._words):
+            view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedLRUCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class ShardedLRUCache:
+    """
+    A thread-safe LRU cache made of independent shards, each with its own lock.
+
+    Keys are hashed to one of the shards, so threads working on different keys
+    rarely wait on the same lock. Recency is tracked per shard, which makes
+    eviction approximately rather than strictly least recently used.
+
+    Attributes:
+    -----------
+    capacity : int
+        The total number of items the cache can hold, split evenly over the shards.
+    shards : list
+        The underlying caches, one per shard.
+    locks : list[threading.Lock]
+        The lock guarding each shard.
+    """
+
+    def __init__(self, capacity: int, num_shards: int = 16,
+                 cache_cls: Callable[[int], Any] = LRU_Cache) -> None:
+        """
+        Constructs all the necessary attributes for the ShardedLRUCache object.
+
+        Parameters:
+        -----------
+        capacity : int
+            The total number of items the cache can hold.
+        num_shards : int
+            The number of independent shards; fewer if capacity is smaller.
+        cache_cls : Callable[[int], Any]
+            The class used for each shard, e.g. LRU_Cache or ArrayLRUCache.
+        """
+        assert capacity > 0, "Capacity must be positive"
+        assert num_shards > 0, "Number of shards must be positive"
+        num_shards = min(num_shards, capacity)
+        self.capacity: int = capacity
+        base, extra = divmod(capacity, num_shards)
+        self.shards: list[Any] = [cache_cls(base + (i < extra)) for i in range(num_shards)]
+        self.locks: list[threading.Lock] = [threading.Lock() for _ in range(num_shards)]
+
+    def _shard(self, key: int) -> int:
+        """
+        Return the index of the shard that owns key.
+        """
+        return hash(key) % len(self.shards)
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries over all shards.
+        """
+        return sum(len(shard) for shard in self.shards)
+
+    def get(self, key: int) -> int:
+        """
+        Get the value of the key if the key exists in the cache, otherwise return -1.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be accessed in the cache.
+
+        Returns:
+        --------
+        int
+            The value associated with the key if it exists, otherwise -1.
+
+        >>> cache = ShardedLRUCache(8, num_shards=4)
+        >>> cache.set(3, 30)
+        >>> cache.get(3), cache.get(4)
+        (30, -1)
+        """
+        i = self._shard(key)
+        with self.locks[i]:
+            return self.shards[i].get(key)
+
+    def set(self, key: int, value: int) -> None:
+        """
+        Set or insert the value of a key in its shard, evicting that shard's least
+        recently used entry when the shard is full.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be inserted or updated in the cache.
+        value : int
+            The value to be associated with the key, must be positive.
+        """
+        i = self._shard(key)
+        with self.locks[i]:
+            self.shards[i].set(key, value)
+
+
+class SharedLRUCache(ShardedLRUCache):
+    """
+    A ShardedLRUCache whose shards live in shared memory, so that several
+    processes, such as pre-forked workers, use one cache between them.
+
+    Each shard is an ArrayLRUCache laid out in its own region of a single
+    multiprocessing.shared_memory block and guarded by its own
+    multiprocessing.Lock, so processes only wait on each other when their keys
+    land in the same shard. Keys and values must fit in a signed 64-bit integer.
+
+    Create the cache in the parent before forking; children inherit it. With
+    other start methods, create it with that multiprocessing context and pass it
+    to the Process as an argument; the child attaches to the same block. The
+    creator should call unlink() once every process is done with it.
+
+    Attributes:
+    -----------
+    shm : shared_memory.SharedMemory
+        The shared block holding every shard.
+    """
+
+    def __init__(self, capacity: int, num_shards: int = 16, context: Optional[Any] = None) -> None:
+        """
+        Constructs all the necessary attributes for the SharedLRUCache object.
+
+        Parameters:
+        -----------
+        capacity : int
+            The total number of items the cache can hold.
+        num_shards : int
+            The number of independently locked shards; fewer if capacity is smaller.
+        context : Optional[Any]
+            The multiprocessing context the worker processes are started with.
+        """
+        assert capacity > 0, "Capacity must be positive"
+        assert num_shards > 0, "Number of shards must be positive"
+        num_shards = min(num_shards, capacity)
+        self.capacity: int = capacity
+        base, extra = divmod(capacity, num_shards)
+        words = sum(ArrayLRUCache.words_needed(base + (i < extra)) for i in range(num_shards))
+        self.shm: shared_memory.SharedMemory = shared_memory.SharedMemory(create=True, size=8 * words)
+        context = context or multiprocessing.get_context()
+        self.locks: list[Any] = [context.Lock() for _ in range(num_shards)]
+        self._attach(clear=True)
+
+    def _attach(self, clear: bool) -> None:
+        """
+        Lay the shards out over the shared block.
+        """
+        num_shards = len(self.locks)
+        base, extra = divmod(self.capacity, num_shards)
+        self._words = memoryview(self.shm.buf).cast('q')
+        self.shards: list[Any] = []
+        start = 0
+        for i in range(num_shards):
+            cap = base + (i < extra)
+            end = start + ArrayLRUCache.words_needed(cap)
+            self.shards.append(ArrayLRUCache.from_buffer(self._words[start:end], cap, clear))
+            start = end
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        Pickle the block name and the locks, for handing the cache to a new process.
+        """
+        return {"capacity": self.capacity, "name": self.shm.name, "locks": self.locks}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """
+        Attach to the shared block of the cache that was pickled.
+        """
+        self.capacity = state["capacity"]
+        self.locks = state["locks"]
+        self.shm = shared_memory.SharedMemory(name=state["name"])
+        self._attach(clear=False)
+
+    def close(self) -> None:
+        """
+        Detach this process from the shared block. The object cannot be used afterwards.
+        """
+        for shard in self.shards:
+            for view in (shard._meta, shard._prev, shard._next, shard._keys,
+                         shard._values, shard._table, shard._raw):
+                view.release()
+        self.shards = []
+        self._words.release()
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """
+        Free the shared block once every process has closed it.
+        """
+        self.shm.unlink()
+
+
+class AsyncLRUCache:
+    """
+    An asyncio read-through front end over an LRU cache.
+
+    A miss calls the loader coroutine and stores its result. Concurrent misses for
+    the same key share a single in-flight load (single-flight), so a hot key that
+    falls out of the cache is loaded once rather than once per waiting coroutine.
+
+    Attributes:
+    -----------
+    cache : Any
+        The underlying cache, e.g. an LRU_Cache or ArrayLRUCache.
+    loader : Callable[[int], Awaitable[int]]
+        The coroutine function that computes the value of a missing key.
+    inflight : dict[int, asyncio.Future]
+        The loads currently running, keyed by the key being loaded.
+    """
+
+    def __init__(self, capacity: int, loader: Callable[[int], Awaitable[int]],
+                 cache_cls: Callable[[int], Any] = LRU_Cache) -> None:
+        """
+        Constructs all the necessary attributes for the AsyncLRUCache object.
+
+        Parameters:
+        -----------
+        capacity : int
+            The maximum number of items the cache can hold.
+        loader : Callable[[int], Awaitable[int]]
+            The coroutine function called with a key on a miss; it must return a
+            value accepted by the underlying cache's set().
+        cache_cls : Callable[[int], Any]
+            The class used for the underlying cache.
+        """
+        self.cache: Any = cache_cls(capacity)
+        self.loader: Callable[[int], Awaitable[int]] = loader
+        self.inflight: dict[int, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries in the cache.
+        """
+        return len(self.cache)
+
+    async def get(self, key: int) -> int:
+        """
+        Get the value of the key, loading and storing it on a miss.
+
+        A caller that is cancelled while waiting does not cancel the shared load, and
+        a loader error is raised to every waiter without being cached.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be accessed in the cache.
+
+        Returns:
+        --------
+        int
+            The cached or freshly loaded value.
+
+        >>> async def double(key):
+        ...     return key * 2
+        >>> cache = AsyncLRUCache(2, double)
+        >>> asyncio.run(cache.get(21)), cache.cache.get(21)
+        (42, 42)
+        """
+        value = self.cache.get(key)
+        if value != -1:
+            return value
+        future = self.inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key))
+            self.inflight[key] = future
+        return await asyncio.shield(future)
+
+    async def _load(self, key: int) -> int:
+        """
+        Run the loader for key, store the result and retire the in-flight entry.
+        """
+        try:
+            value = await self.loader(key)
+            self.cache.set(key, value)
+            return value
+        finally:
+            del self.inflight[key]
+
+    def set(self, key: int, value: int) -> None:
+        """
+        Set or insert the value of a key directly, bypassing the loader.
+
+        Parameters:
+        -----------
+        key : int
+            The key to be inserted or updated in the cache.
+        value : int
+            The value to be associated with the key.
+        """
+        self.cache.set(key, value)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=False)
+
+    # Testing the LRU_Cache class
+
+    # Test Case 1: Basic functionality
+    our_cache = LRU_Cache(5)
+    our_cache.set(1, 1)
+    our_cache.set(2, 2)
+    our_cache.set(3, 3)
+    our_cache.set(4, 4)
+    assert our_cache.get(1) == 1   # Returns 1
+    assert our_cache.get(2) == 2   # Returns 2
+    assert our_cache.get(9) == -1  # Returns -1 because 9 is not in the cache
+
+    our_cache.set(5, 5)
+    our_cache.set(6, 6)  # This should evict key 3
+    assert our_cache.get(3) == -1  # Returns -1, 3 was evicted
+
+    # Test Case 2
+    test_cache = LRU_Cache(3)
+    test_cache.set(2,3)
+    test_cache.set(2,4)
+    assert len(test_cache.cache) == 1
+    assert test_cache.get(2) == 4
+
+    # Test Case 3
+    # Eviction extreme case
+    test_cache2 = LRU_Cache(1)
+    test_cache2.set(1,1)
+    test_cache2.set(2,2)
+    test_cache2.set(3,3)
+    assert test_cache2.get(1) == -1
+    assert test_cache2.get(2) == -1
+    assert test_cache2.get(3) == 3
+
+    # test Case 4
+    # updated key is evicted
+    test_cache3=LRU_Cache(2)
+    test_cache3.set(1,1)
+    assert len(test_cache3.cache) == 1
+    test_cache3.set(1,2)
+    assert len(test_cache3.cache) == 1
+    test_cache3.set(2,2)
+    assert len(test_cache3.cache) == 2
+    test_cache3.set(3,3)
+    assert len(test_cache3.cache) == 2
+    assert test_cache3.get(1) == -1
+    assert test_cache3.get(3) == 3
+    assert test_cache3.get(2) == 2
+
+    #test cases for invalid values
+    test_bad = LRU_Cache(5)
+    try:
+        test_bad.set(None, 1)
+    except AssertionError as err:
+        assert repr(err) == "AssertionError('Invalid key input type')"
+
+    try:
+        test_bad.set(1, None)
+    except AssertionError as err:
+        assert repr(err) ==  "AssertionError('Invalid value input type')"
+
+    try:
+        test_bad.set(1, -2)
+    except AssertionError as err:
+        assert repr(err) == "AssertionError('Negative values reserved for missing keys')"
+
+    test_bad.set(1,1)
+    for i in range(0, 1_000_000):
+        test_bad.get(1)
+    assert len(test_bad.cache) == 1
+    assert test_bad.get(1) == 1
+    
+    for i in range(0, 1_000_000):
+        test_bad.set(1, i)
+    assert len(test_bad.cache) == 1
+    assert test_bad.get(1) == 999_999
+
+    try:
+        bad_cap = LRU_Cache(-10)
+    except AssertionError as err:
+        assert repr(err) == "AssertionError('Capacity must be positive')"
+
+    test_duplicates = LRU_Cache(5)
+    test_duplicates.set(999_999_999, 1)
+    test_duplicates.set(1_000_000_000, 1)
+    test_duplicates.set(2**32, 1)
+    assert test_duplicates.get(999_999_999) == 1
+    assert test_duplicates.get(1_000_000_000) == 1
+    assert test_duplicates.get(2**32) == 1
+
+    test_big = LRU_Cache(1_000_000)
+    for i in range(0, 1_000_000):
+        test_big.set(i, i)
+    
+    for i in range(0, 1_000_000):
+        assert test_big.get(i) == i
+
+    # Test Case: hits and updates reuse the same node, the list stays consistent
+    test_inplace = LRU_Cache(3)
+    for i in range(3):
+        test_inplace.set(i, i)
+    node_one = test_inplace.cache[1]
+    assert test_inplace.get(1) == 1
+    assert test_inplace.cache[1] is node_one
+    assert test_inplace.data.head is node_one
+    test_inplace.set(1, 10)
+    assert test_inplace.cache[1] is node_one
+    assert list(test_inplace.data) == [10, 2, 0]
+    test_inplace.set(3, 3)  # evicts key 0, recycling its node
+    assert test_inplace.get(0) == -1
+    assert list(test_inplace.data) == [3, 10, 2]
+    assert test_inplace.data.tail is test_inplace.cache[2]
+    assert test_inplace.data.head.prev is None
+    assert test_inplace.data.tail.next is None
+    assert {n: node.key for n, node in test_inplace.cache.items()} == {1: 1, 2: 2, 3: 3}
+
+    # ArrayLRUCache behaves like LRU_Cache
+    test_array = ArrayLRUCache(5)
+    for i in range(1, 5):
+        test_array.set(i, i)
+    assert test_array.get(1) == 1
+    assert test_array.get(2) == 2
+    assert test_array.get(9) == -1
+    test_array.set(5, 5)
+    test_array.set(6, 6)
+    assert test_array.get(3) == -1
+    assert test_array.keys() == [6, 5, 2, 1, 4]
+    test_array.set(2, 20)
+    assert test_array.get(2) == 20
+    assert len(test_array) == 5
+
+    try:
+        test_array.set(2**63, 1)
+    except AssertionError as err:
+        assert repr(err) == "AssertionError('Value out of int64 range')"
+
+    # Randomised comparison against LRU_Cache, with colliding keys to exercise
+    # the backward-shift deletion in the hash table
+    import random
+    rng = random.Random(7)
+    reference = LRU_Cache(64)
+    test_array = ArrayLRUCache(64)
+    for _ in range(50_000):
+        key = rng.randrange(200) * rng.choice((1, 1 << 20, -(1 << 40)))
+        if rng.random() < 0.5:
+            value = rng.randrange(1_000)
+            reference.set(key, value)
+            test_array.set(key, value)
+        else:
+            assert reference.get(key) == test_array.get(key)
+    reference_order = []
+    node = reference.data.head
+    while node is not None:
+        reference_order.append(node.key)
+        node = node.next
+    assert test_array.keys() == reference_order
+    assert len(test_array) == len(reference.cache)
+
+    # ShardedLRUCache splits the capacity over independently locked shards
+    test_sharded = ShardedLRUCache(10, num_shards=4)
+    assert [shard.capacity for shard in test_sharded.shards] == [3, 3, 2, 2]
+    for i in range(100):
+        test_sharded.set(i, i)
+    assert len(test_sharded) == 10
+    assert test_sharded.get(99) == 99
+    assert test_sharded.get(0) == -1
+    assert len(ShardedLRUCache(2, num_shards=16).shards) == 2
+    assert ShardedLRUCache(8, cache_cls=ArrayLRUCache).get(1) == -1
+
+    try:
+        test_sharded.set(1, -2)
+    except AssertionError as err:
+        assert repr(err) == "AssertionError('Negative values reserved for missing keys')"
+
+    # Concurrent writers never corrupt a shard's list or exceed its capacity
+    test_threads = ShardedLRUCache(1_000, num_shards=8)
+
+    def hammer(offset: int) -> None:
+        for i in range(20_000):
+            key = (i * 7 + offset) % 3_000
+            if test_threads.get(key) == -1:
+                test_threads.set(key, key)
+
+    workers = [threading.Thread(target=hammer, args=(n,)) for n in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(test_threads) <= 1_000
+    for shard in test_threads.shards:
+        assert len(shard.cache) <= shard.capacity
+        assert sorted(node.key for node in shard.cache.values()) == sorted(shard.cache)
+        assert sum(1 for _ in shard.data) == len(shard.cache)
+
+    # AsyncLRUCache coalesces concurrent misses for one key into a single load
+    loads: list[int] = []
+
+    async def slow_square(key: int) -> int:
+        loads.append(key)
+        await asyncio.sleep(0.01)
+        return key * key
+
+    async def herd() -> None:
+        cache = AsyncLRUCache(2, slow_square)
+        values = await asyncio.gather(*(cache.get(k % 2 + 3) for k in range(200)))
+        assert values == [9, 16] * 100
+        assert sorted(loads) == [3, 4]
+        assert cache.inflight == {}
+        assert await cache.get(3) == 9
+        assert len(loads) == 2
+        await cache.get(5)  # evicts 4, the least recently used key
+        assert cache.cache.get(4) == -1
+        cache.set(4, 1)
+        assert await cache.get(4) == 1
+
+        # A cancelled waiter does not cancel the load the others share
+        waiters = [asyncio.ensure_future(cache.get(7)) for _ in range(3)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()
+        assert await asyncio.gather(*waiters[1:]) == [49, 49]
+        assert loads.count(7) == 1
+
+        # Loader errors reach every waiter and are not cached
+        async def failing(key: int) -> int:
+            await asyncio.sleep(0)
+            raise KeyError(key)
+
+        broken = AsyncLRUCache(2, failing)
+        results = await asyncio.gather(broken.get(1), broken.get(1), return_exceptions=True)
+        assert all(isinstance(r, KeyError) for r in results)
+        assert broken.inflight == {} and len(broken) == 0
+
+    asyncio.run(herd())
+
+    # Every eviction policy keeps to its capacity and agrees with a plain dict on
+    # the values of the keys it still holds
+    for name, policy in POLICIES.items():
+        test_policy = policy(50)
+        shadow: dict[int, int] = {}
+        for _ in range(20_000):
+            key = rng.randrange(200)
+            if rng.random() < 0.5:
+                value = rng.randrange(1_000)
+                test_policy.set(key, value)
+                shadow[key] = value
+            else:
+                value = test_policy.get(key)
+                assert value == -1 or value == shadow[key], name
+            assert len(test_policy) <= 50, name
+        assert len(test_policy) > 0, name
+
+    # LFUCache evicts the least frequently used key, oldest first among ties
+    test_lfu = LFUCache(3)
+    for i in range(3):
+        test_lfu.set(i, i)
+    test_lfu.get(0)
+    test_lfu.get(0)
+    test_lfu.get(2)
+    test_lfu.set(3, 3)  # evicts 1, the only key used once
+    assert test_lfu.get(1) == -1
+    test_lfu.set(4, 4)  # evicts 3, tied with 2 on two uses but older
+    assert test_lfu.get(3) == -1
+    assert sorted(test_lfu.cache) == [0, 2, 4]
+    assert test_lfu.min_count == 1
+    assert sum(1 for bucket in test_lfu.buckets.values() for _ in bucket) == 3
+    for count, bucket in test_lfu.buckets.items():
+        node = bucket.head
+        while node is not None:
+            assert node.count == count
+            node = node.next
+
+    # A burst of one-hit wonders does not flush ARC's frequently used keys
+    test_scan = ARCCache(100)
+    plain = LRU_Cache(100)
+    for _ in range(5):
+        for key in range(80):
+            for cache in (test_scan, plain):
+                if cache.get(key) == -1:
+                    cache.set(key, key)
+    for key in range(1_000, 3_000):
+        for cache in (test_scan, plain):
+            if cache.get(key) == -1:
+                cache.set(key, key)
+    assert sum(test_scan.get(key) != -1 for key in range(80)) == 80
+    assert all(plain.get(key) == -1 for key in range(80))
+
+    # TinyLFU keeps a working set that is scanned in between every pass over it
+    test_tiny = TinyLFUCache(100)
+    scan_key = 10_000
+    hits = 0
+    for _ in range(30):
+        for key in range(80):
+            if test_tiny.get(key) == -1:
+                test_tiny.set(key, key)
+            else:
+                hits += 1
+        for _ in range(100):
+            scan_key += 1
+            if test_tiny.get(scan_key) == -1:
+                test_tiny.set(scan_key, scan_key)
+    assert hits > 0.8 * 30 * 80
+
+    # ARC keeps its lists within the bounds of the algorithm
+    test_arc = ARCCache(20)
+    for _ in range(10_000):
+        key = int(rng.paretovariate(1.0)) % 100
+        if test_arc.get(key) == -1:
+            test_arc.set(key, key)
+        sizes = test_arc.sizes
+        assert sizes[_T1] + sizes[_T2] <= 20
+        assert sizes[_T1] + sizes[_B1] <= 20
+        assert sum(sizes) <= 40
+        assert 0 <= test_arc.p <= 20
+        assert len(test_arc.cache) == sum(sizes)
+
+    assert isinstance(ShardedLRUCache(8, cache_cls=ARCCache).shards[0], ARCCache)
+
+    # TTLCache expires entries lazily and sweeps them on later writes
+    clock_now = [0.0]
+    test_ttl = TTLCache(3, ttl=10, clock=lambda: clock_now[0])
+    test_ttl.set(1, "one")
+    test_ttl.set(2, [2], ttl=30)
+    clock_now[0] = 15.0
+    assert test_ttl.get(2) == [2]
+    assert len(test_ttl) == 2  # 1 is stale but not yet removed
+    test_ttl.set(3, 3)  # the sweep removes 1
+    assert sorted(test_ttl.cache) == [2, 3]
+    test_ttl.set(4, 4)
+    test_ttl.set(5, 5)  # full of live entries: evicts 2, the least recently used
+    assert test_ttl.get(2) == -1
+    test_ttl.set(3, 30, ttl=100)  # a refresh replaces the expiry time
+    clock_now[0] = 40.0
+    assert test_ttl.get(3) == 30
+    assert test_ttl.get(4) == -1
+    assert test_ttl.expire() == 1
+    assert list(test_ttl.cache) == [3]
+    assert test_ttl.weight == 1
+
+    # The expiry heap stays proportional to the live entries under updates
+    test_churn = TTLCache(10, ttl=1_000, clock=lambda: clock_now[0])
+    for i in range(10_000):
+        test_churn.set(i % 5, i)
+    assert len(test_churn.expiry) <= 2 * len(test_churn.cache) + 16
+
+    # A weigher bounds the total weight instead of the number of entries
+    test_weighted = TTLCache(100, weigher=len)
+    for i in range(10):
+        test_weighted.set(i, b"x" * 30)
+    assert test_weighted.weight == 90 and len(test_weighted) == 3
+    assert sorted(test_weighted.cache) == [7, 8, 9]
+    test_weighted.set(8, b"x" * 70)  # replacing 8 evicts 7 to make room
+    assert sorted(test_weighted.cache) == [8, 9] and test_weighted.weight == 100
+    test_weighted.set(1, b"x" * 101)  # too big to store at all
+    assert test_weighted.get(1) == -1 and test_weighted.weight == 100
+    test_weighted.set(8, b"")
+    assert test_weighted.weight == 30 and test_weighted.get(8) == b""
+
+    try:
+        TTLCache(5, ttl=0)
+    except AssertionError as err:
+        assert repr(err) == "AssertionError('TTL must be positive')"
+
+    assert ShardedLRUCache(8, cache_cls=TTLCache).get(1) == -1
+
+    # Statistics are opt-in, count every outcome and can be reset or switched off
+    test_stats = LRU_Cache(2)
+    assert test_stats.stats is None and "get" not in vars(test_stats)
+    stats = test_stats.enable_stats()
+    for i in range(4):
+        test_stats.set(i, i)
+    test_stats.set(3, 30)  # an update evicts nothing
+    assert [test_stats.get(i) for i in range(4)] == [-1, -1, 2, 30]
+    snap = test_stats.stats.snapshot()
+    assert (snap["hits"], snap["misses"], snap["sets"], snap["evictions"]) == (2, 2, 5, 2)
+    assert snap["hit_ratio"] == 0.5
+    assert sum(snap["get_ns_histogram"].values()) == 4
+    assert sum(snap["set_ns_histogram"].values()) == 5
+    assert 0 < snap["get_ns_p50"] <= snap["get_ns_p99"]
+    stats.reset()
+    assert stats.snapshot()["sets"] == 0 and sum(stats.get_ns) == 0
+    test_stats.disable_stats()
+    assert test_stats.stats is None and "get" not in vars(test_stats)
+    test_stats.get(3)
+    assert stats.hits == 0
+
+    # Subclasses are instrumented too, with their own set() arguments
+    test_ttl_stats = TTLCache(10, weigher=len)
+    ttl_stats = test_ttl_stats.enable_stats(timing=False)
+    test_ttl_stats.set(1, "x" * 6, ttl=5)
+    test_ttl_stats.set(2, "x" * 6)  # evicts 1 to fit
+    test_ttl_stats.set(2, "x" * 2)
+    assert (ttl_stats.sets, ttl_stats.evictions) == (3, 1)
+    assert "get_ns_p50" not in ttl_stats.snapshot()
+
+    # memoize caches any hashable arguments, normalizing keyword calls
+    calls: list[tuple] = []
+
+    @memoize(maxsize=3)
+    def describe(name: str, *, upper: bool = False, sep: str = ":") -> tuple:
+        calls.append((name, upper, sep))
+        return (name.upper() if upper else name, sep)
+
+    assert describe("a") == ("a", ":")
+    assert describe("a", upper=False) is describe("a", sep=":", upper=False)
+    assert describe("a", upper=True) == ("A", ":")
+    assert len(calls) == 2
+    describe("b")
+    describe("c")  # evicts ("a",) with the default keywords
+    describe("a")
+    assert len(calls) == 5
+    info = describe.cache_info()
+    assert (info["hits"], info["misses"], info["evictions"], info["size"]) == (2, 5, 2, 3)
+    describe.cache_clear()
+    assert describe.cache_info()["size"] == 0 and describe.cache.data.head is None
+    describe("a")
+    assert len(calls) == 6 and describe.__name__ == "describe"
+
+    @memoize(maxsize=100)
+    def fib(n: int) -> int:
+        return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+    assert fib(90) == 2880067194370816120
+    assert fib.stats.misses == 91
+
+    @memoize()
+    def pair(a, b=None):
+        return a, b
+
+    assert pair(None) == (None, None) and pair(None, None) == (None, None)
+    assert pair(b=None, a=None) == (None, None)
+    assert pair.stats.hits == 2
+    for bad_call in (lambda: pair(), lambda: pair(1, c=2), lambda: pair(1, a=1), lambda: pair(1, 2, 3)):
+        try:
+            bad_call()
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("invalid calls must raise like the undecorated function")
+    try:
+        pair([1])
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("unhashable arguments must be rejected")
+
+    # MappedLRUCache keeps its entries, and their order, across reopening
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.bin")
+        with MappedLRUCache(path, 4) as test_mapped:
+            for i in range(6):
+                test_mapped.set(i, i * 10)
+            assert test_mapped.get(3) == 30
+            order = test_mapped.keys()
+        with MappedLRUCache(path) as test_mapped:
+            assert not test_mapped.recovered
+            assert test_mapped.capacity == 4 and len(test_mapped) == 4
+            assert test_mapped.keys() == order == [3, 5, 4, 2]
+            assert test_mapped.get(0) == -1 and test_mapped.get(2) == 20
+            test_mapped.set(7, 70)
+            assert test_mapped.get(4) == -1
+
+        try:
+            MappedLRUCache(path, 8)
+        except AssertionError as err:
+            assert repr(err) == "AssertionError('Capacity does not match the file')"
+
+        # A crash part-way through an update leaves the dirty flag raised; the
+        # next open rebuilds a consistent cache from the indexed slots
+        with MappedLRUCache(path) as test_mapped:
+            expected = {key: test_mapped.get(key) for key in test_mapped.keys()}
+            head = test_mapped._meta[_HEAD]
+            head_key = test_mapped._keys[head]
+            test_mapped._meta[_DIRTY] = 1
+            test_mapped._next[head] = head  # a torn link
+            # An insert that evicted the tail and wrote its key but never indexed it
+            tail = test_mapped._meta[_TAIL]
+            del expected[test_mapped._keys[tail]]
+            test_mapped._evict()
+            test_mapped._keys[test_mapped._meta[_FREE]] = 12_345
+        with MappedLRUCache(path) as test_mapped:
+            assert test_mapped.recovered and test_mapped._meta[_DIRTY] == 0
+            assert test_mapped.keys()[0] == head_key
+            assert {key: test_mapped.get(key) for key in test_mapped.keys()} == expected
+            assert test_mapped.get(12_345) == -1
+            for i in range(100):
+                test_mapped.set(i, i)
+            assert test_mapped.keys() == [99, 98, 97, 96]
+
+        other = os.path.join(tmp, "other.bin")
+        with open(other, "wb") as f:
+            f.write(b"\0" * 4096)
+        try:
+            MappedLRUCache(other)
+        except AssertionError as err:
+            assert repr(err) == "AssertionError('Not a MappedLRUCache file')"
+
+        # A crash while the file is created leaves its header flagged dirty, with
+        # or without the slots behind it; the next open finishes the file
+        header = array('q', bytes(8 * _HEADER_WORDS))
+        header[_MAGIC], header[_CAPACITY], header[_DIRTY] = _FILE_MAGIC, 4, 1
+        for size in (len(header), ArrayLRUCache.words_needed(4)):
+            torn = os.path.join(tmp, f"torn{size}.bin")
+            with open(torn, "wb") as f:
+                f.write(header.tobytes() + bytes(8 * (size - len(header))))
+            with MappedLRUCache(torn) as test_mapped:
+                assert test_mapped.recovered and len(test_mapped) == 0
+                test_mapped.set(1, 10)
+            with MappedLRUCache(torn) as test_mapped:
+                assert not test_mapped.recovered and test_mapped.get(1) == 10
+
+        # A rejected file is closed again
+        import gc
+        import warnings
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            for args in ((path, 8), (other,), (os.path.join(tmp, "new.bin"),)):
+                try:
+                    MappedLRUCache(*args)
+                except AssertionError:
+                    pass
+                else:
+                    raise AssertionError("the file must be rejected")
+            gc.collect()
+        assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+    # SharedLRUCache is one cache for every process that uses it
+    def shared_worker(cache: SharedLRUCache, offset: int) -> None:
+        for i in range(200):
+            cache.set(offset * 1_000 + i, offset)
+        cache.close()
+
+    test_shared = SharedLRUCache(1_000, num_shards=4)
+    try:
+        fork = multiprocessing.get_context("fork")
+        children = [fork.Process(target=shared_worker, args=(test_shared, n)) for n in range(4)]
+        for child in children:
+            child.start()
+        for child in children:
+            child.join()
+            assert child.exitcode == 0
+        assert len(test_shared) == 800
+        assert all(test_shared.get(n * 1_000 + 199) == n for n in range(4))
+
+        assert len(test_shared) <= 1_000
+        for shard in test_shared.shards:
+            assert len(shard) <= shard.capacity and len(shard.keys()) == len(shard)
+    finally:
+        test_shared.close()
+        test_shared.unlink()
+
+    # A spawned process attaches to the same block by name
+    spawn = multiprocessing.get_context("spawn")
+    test_spawned = SharedLRUCache(10, num_shards=2, context=spawn)
+    try:
+        child = spawn.Process(target=test_spawned.set, args=(42, 7))
+        child.start()
+        child.join()
+        assert child.exitcode == 0
+        assert test_spawned.get(42) == 7
+    finally:
+        test_spawned.close()
+        test_spawned.unlink()
@@ -1,8 +1,18 @@
+import bisect
 import heapq
-from collections import defaultdict
-from typing import Optional
+import io
+import os
+from collections import Counter, defaultdict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
 import random
 import string
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # optional: byte counting falls back to pure Python
+    np = None
 
 # Huffman Tree Node
 class HuffmanNode:
@@ -203,21 +213,1119 @@ def huffman_decoding(encoded_data: str, tree: Optional[HuffmanNode]) -> str:
     str
         The decoded string.
     """
-    result: str = ""
+    result: list[str] = []
     curr = tree
     for dir in encoded_data:
         assert curr is not None
         if dir == '0':
             curr = curr.left
             if curr is not None and curr.char is not None:
-                result += curr.char
+                result.append(curr.char)
                 curr = tree
         else:
             curr = curr.right
             if curr is not None and curr.char is not None:
-                result += curr.char
+                result.append(curr.char)
                 curr = tree
-    return result
+    return "".join(result)
+
+
+# Byte-oriented codec. Codes are canonical, so the header only needs the magic,
+# the decoded length, the number of symbols and every symbol's code length:
+# (symbol, length) pairs for small alphabets, one length per byte value for
+# large ones, whichever is shorter.
+_MAGIC = b"HUF2"
+_PAIRS_LIMIT = 128
+_HEADER = struct.Struct(">4sQH")
+_CHUNK = 1 << 16
+
+_NUMPY_MIN = 1 << 12
+
+def _python_byte_frequencies(data: bytes) -> dict[int, int]:
+    """Count each byte value of data with collections.Counter."""
+    return dict(sorted(Counter(data).items()))
+
+def _numpy_byte_frequencies(data: bytes) -> dict[int, int]:
+    """Count each byte value of data with numpy.bincount."""
+    counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+    return {int(symbol): int(counts[symbol]) for symbol in np.flatnonzero(counts)}
+
+def byte_frequencies(data: bytes) -> dict[int, int]:
+    """
+    Count each byte value of data, in byte order, counting in C rather than a Python loop.
+
+    Inputs of 4 KiB or more are counted with NumPy when it is installed.
+
+    >>> byte_frequencies(b"abbccc")
+    {97: 1, 98: 2, 99: 3}
+    """
+    if np is not None and len(data) >= _NUMPY_MIN:
+        return _numpy_byte_frequencies(data)
+    return _python_byte_frequencies(data)
+
+def _pack_table(data: bytes, table: list[str]) -> bytearray:
+    """Pack the codes of data given as a list of the code text of every byte value."""
+    out = bytearray()
+    pending = ""
+    for start in range(0, len(data), _CHUNK):
+        bits = pending + "".join(map(table.__getitem__, data[start:start + _CHUNK]))
+        whole = len(bits) - len(bits) % 8
+        if whole:
+            out += int(bits[:whole], 2).to_bytes(whole // 8, "big")
+        pending = bits[whole:]
+    if pending:
+        out.append(int(pending.ljust(8, "0"), 2))
+    return out
+
+def pack_bits(data: bytes, codes: dict[int, str]) -> bytearray:
+    """
+    Concatenate the code of every byte of data and pack the bits into bytes.
+
+    The input is encoded a chunk at a time so the '0'/'1' text only ever
+    exists for one chunk. The last byte is padded with zero bits.
+
+    >>> pack_bits(b"abbccc", {97: '10', 98: '11', 99: '0'})
+    bytearray(b'\\xbc\\x00')
+    """
+    table = [""] * 256
+    for symbol, code in codes.items():
+        table[symbol] = code
+    return _pack_table(data, table)
+
+def code_lengths(tree: HuffmanNode) -> dict:
+    """
+    Return the depth of every leaf of a tree from build_huffman_tree.
+
+    >>> sorted(code_lengths(build_huffman_tree({'a': 4, 'b': 2, 'c': 1})).items())
+    [('a', 1), ('b', 2), ('c', 2)]
+    >>> code_lengths(build_huffman_tree({'a': 4}))
+    {'a': 1}
+    """
+    lengths = {}
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if node.char is not None:
+            lengths[node.char] = depth
+            continue
+        for child in (node.right, node.left):
+            if child is not None:
+                stack.append((child, depth + 1))
+    return lengths
+
+def canonical_codes(lengths: dict) -> dict:
+    """
+    Assign canonical Huffman codes from code lengths alone.
+
+    Symbols are sorted by code length, then by symbol, and each takes the next
+    binary number, shifted left whenever the length grows. Any tree with the
+    same depths compresses equally well, and a decoder only needs the lengths.
+
+    >>> canonical_codes({97: 2, 98: 2, 99: 1})
+    {99: '0', 97: '10', 98: '11'}
+    """
+    codes = {}
+    value = previous = 0
+    for symbol in sorted(lengths, key=lambda s: (lengths[s], s)):
+        value <<= lengths[symbol] - previous
+        previous = lengths[symbol]
+        codes[symbol] = format(value, f"0{previous}b")
+        value += 1
+    return codes
+
+def serialize_code_lengths(lengths: dict[int, int], length: int) -> bytes:
+    """
+    Return the header describing canonical codes and the decoded length.
+
+    >>> serialize_code_lengths({97: 2, 98: 2, 99: 1}, 6).hex()
+    '4855463200000000000000060003610262026301'
+    """
+    header = bytearray(_HEADER.pack(_MAGIC, length, len(lengths)))
+    if len(lengths) <= _PAIRS_LIMIT:
+        for symbol in sorted(lengths):
+            header += bytes((symbol, lengths[symbol]))
+    else:
+        header += bytes(lengths.get(symbol, 0) for symbol in range(256))
+    return bytes(header)
+
+def deserialize_code_lengths(blob: bytes) -> tuple[dict[int, int], int, int]:
+    """
+    Parse a header written by serialize_code_lengths.
+
+    Returns:
+    --------
+    Tuple[Dict[int, int], int, int]
+        The code lengths, the decoded length and the offset of the packed bits.
+
+    >>> deserialize_code_lengths(serialize_code_lengths({97: 2, 98: 2, 99: 1}, 6))
+    ({97: 2, 98: 2, 99: 1}, 6, 20)
+    """
+    if len(blob) < _HEADER.size:
+        raise ValueError("truncated Huffman header")
+    magic, length, count = _HEADER.unpack_from(blob)
+    if magic != _MAGIC:
+        raise ValueError("not Huffman compressed data")
+    offset = _HEADER.size
+    if count <= _PAIRS_LIMIT:
+        table = blob[offset:offset + 2 * count]
+        lengths = dict(zip(table[::2], table[1::2]))
+        offset += 2 * count
+    else:
+        table = blob[offset:offset + 256]
+        lengths = {symbol: bits for symbol, bits in enumerate(table) if bits}
+        offset += 256
+    if offset > len(blob):
+        raise ValueError("truncated Huffman header")
+    # The lengths of a prefix code satisfy Kraft's inequality
+    longest = max(lengths.values(), default=0)
+    if len(lengths) != count or 0 in lengths.values() or \
+            sum(1 << (longest - bits) for bits in lengths.values()) > 1 << longest:
+        raise ValueError("invalid Huffman code lengths")
+    return lengths, length, offset
+
+def tree_from_codes(codes: dict[int, str]) -> HuffmanNode:
+    """
+    Rebuild a decoding tree from a code table. Frequencies are not kept.
+
+    >>> tree = tree_from_codes({97: '10', 98: '11', 99: '0'})
+    >>> tree.left.char, tree.right.left.char, tree.right.right.char
+    (99, 97, 98)
+    """
+    root = HuffmanNode(None, 0)
+    for symbol, code in codes.items():
+        node = root
+        for bit in code:
+            if bit == "0":
+                if node.left is None:
+                    node.left = HuffmanNode(None, 0)
+                node = node.left
+            else:
+                if node.right is None:
+                    node.right = HuffmanNode(None, 0)
+                node = node.right
+        node.char = symbol
+    return root
+
+def huffman_compress(data: bytes) -> bytes:
+    """
+    Encode bytes with Huffman coding into a self-describing byte string.
+
+    Unlike huffman_encoding the bits are packed eight to a byte and the codes
+    are canonical, so the header only carries each symbol's code length and
+    huffman_decompress needs nothing else.
+
+    Parameters:
+    -----------
+    data : bytes
+        The input bytes to be encoded.
+
+    Returns:
+    --------
+    bytes
+        The header followed by the packed codes.
+
+    >>> blob = huffman_compress(b"abbccc")
+    >>> len(blob), huffman_decompress(blob)
+    (22, b'abbccc')
+    """
+    lengths = code_lengths(build_huffman_tree(byte_frequencies(data)))
+    return serialize_code_lengths(lengths, len(data)) + pack_bits(data, canonical_codes(lengths))
+
+def build_decode_table(codes: dict[int, str]) -> tuple[list[bytes], list[int]]:
+    """
+    Build the tables of a decoder that consumes one whole byte per lookup.
+
+    The decoder's state is the part of a code read so far, an internal node of
+    the code tree. Entry (state << 8) | byte holds every symbol completed
+    while reading the eight bits of byte from that state, and the state
+    afterwards, stored shifted left by eight so it can be or'ed with the next
+    byte. A byte that leaves the tree moves to a dead state, numbered after the
+    others, that emits nothing and never leaves.
+
+    >>> emit, follow = build_decode_table({97: '10', 98: '11', 99: '0'})
+    >>> emit[0xbc], follow[0xbc]
+    (b'abbcc', 0)
+    >>> emit[0x80], follow[0x80] >> 8
+    (b'acccccc', 0)
+    >>> emit[(1 << 8) | 0x20], follow[(1 << 8) | 0x20] >> 8
+    (b'acacccc', 0)
+    """
+    states = {"": 0}
+    for code in codes.values():
+        for i in range(1, len(code)):
+            states.setdefault(code[:i], len(states))
+    dead = len(states)
+    by_code = {code: symbol for symbol, code in codes.items()}
+    # Walk every state through every nibble, then join two nibbles per byte
+    nibble_emit: list[list[bytes]] = []
+    nibble_follow: list[list[int]] = []
+    for prefix in states:
+        emit_row, follow_row = [], []
+        for nibble in range(16):
+            out = bytearray()
+            node = prefix
+            for bit in format(nibble, "04b"):
+                node += bit
+                if node in by_code:
+                    out.append(by_code[node])
+                    node = ""
+                elif node not in states:
+                    break
+            emit_row.append(bytes(out))
+            follow_row.append(states.get(node, dead))
+        nibble_emit.append(emit_row)
+        nibble_follow.append(follow_row)
+    nibble_emit.append([b""] * 16)
+    nibble_follow.append([dead] * 16)
+    emit: list[bytes] = []
+    follow: list[int] = []
+    for state in range(dead + 1):
+        for high in range(16):
+            middle = nibble_follow[state][high]
+            first = nibble_emit[state][high]
+            for low in range(16):
+                emit.append(first + nibble_emit[middle][low])
+                follow.append(nibble_follow[middle][low] << 8)
+    return emit, follow
+
+# Decode tables of recently used codes, oldest first. Blocks and messages
+# often share a table, and building one costs far more than a short payload.
+_DECODE_CACHE: dict[tuple[tuple[int, str], ...], tuple[list[bytes], list[int]]] = {}
+_DECODE_CACHE_SIZE = 32
+# Building a table costs about as much per symbol as walking this many bytes
+# of payload bit by bit, so shorter payloads with a new table are walked.
+_WALK_BYTES_PER_SYMBOL = 128
+
+def decode_bits(payload: bytes, codes: dict[int, str], length: int) -> bytes:
+    """
+    Decode `length` symbols from packed codes with a byte-at-a-time table.
+
+    Every input byte costs one table lookup however many symbols it completes,
+    instead of one tree step per bit. The padding bits of the last byte may
+    decode to extra symbols, which are cut off. Tables are cached by code, and
+    a payload too short to pay for building a new table walks the code tree
+    instead.
+
+    Parameters:
+    -----------
+    payload : bytes
+        The packed codes.
+    codes : dict[int, str]
+        The code of every symbol.
+    length : int
+        The number of symbols to decode.
+
+    Returns:
+    --------
+    bytes
+        The decoded symbols.
+
+    >>> decode_bits(b"\\xbc\\x00", {97: '10', 98: '11', 99: '0'}, 6)
+    b'abbccc'
+    """
+    if length == 0:
+        return b""
+    key = tuple(sorted(codes.items()))
+    tables = _DECODE_CACHE.get(key)
+    if tables is None:
+        if len(payload) < _WALK_BYTES_PER_SYMBOL * len(codes):
+            return _decode_walk(payload, codes, length)
+        if len(_DECODE_CACHE) >= _DECODE_CACHE_SIZE:
+            _DECODE_CACHE.pop(next(iter(_DECODE_CACHE)), None)
+        tables = _DECODE_CACHE[key] = build_decode_table(codes)
+    return _decode_table(payload, *tables, length)
+
+def _decode_walk(payload: bytes, codes: dict[int, str], length: int) -> bytes:
+    """
+    Decode `length` symbols by walking the code tree one bit at a time.
+
+    Symbols are stored into a preallocated buffer. The padding bits are walked
+    too, so invalid codes are rejected exactly as by the table decoder.
+    """
+    if not payload:
+        raise ValueError("truncated Huffman data")
+    tree = tree_from_codes(codes)
+    out = bytearray(length)
+    count = 0
+    node = tree
+    try:
+        for bit in format(int.from_bytes(payload, "big"), f"0{len(payload) * 8}b"):
+            node = node.left if bit == "0" else node.right
+            if node.char is not None:
+                if count < length:
+                    out[count] = node.char
+                count += 1
+                node = tree
+    except AttributeError:  # stepped off the tree
+        raise ValueError("invalid Huffman code") from None
+    if count < length:
+        raise ValueError("truncated Huffman data")
+    return bytes(out)
+
+def _decode_table(payload: bytes, emit: list[bytes], follow: list[int], length: int) -> bytes:
+    """Decode `length` symbols with tables from build_decode_table."""
+    dead = follow[-1]
+    out = bytearray()
+    state = 0
+    for byte in payload:
+        i = state | byte
+        out += emit[i]
+        state = follow[i]
+    if state == dead:
+        raise ValueError("invalid Huffman code")
+    if len(out) < length:
+        raise ValueError("truncated Huffman data")
+    del out[length:]
+    return bytes(out)
+
+def huffman_decompress(blob: bytes) -> bytes:
+    """
+    Decode the output of huffman_compress.
+
+    Parameters:
+    -----------
+    blob : bytes
+        The header followed by the packed codes.
+
+    Returns:
+    --------
+    bytes
+        The original bytes.
+    """
+    lengths, length, offset = deserialize_code_lengths(blob)
+    return decode_bits(memoryview(blob)[offset:], canonical_codes(lengths), length)
+
+# Streams are the magic followed by frames, each the size of one
+# huffman_compress block and the block itself, and end with a frame of size 0.
+_STREAM_MAGIC = b"HUFS"
+_FRAME = struct.Struct(">I")
+_BLOCK_SIZE = 1 << 20
+
+def _read_exactly(source: BinaryIO, size: int) -> bytes:
+    """Read size bytes from source, raising ValueError if it ends first."""
+    data = source.read(size)
+    while len(data) < size:
+        more = source.read(size - len(data))
+        if not more:
+            raise ValueError("truncated Huffman stream")
+        data += more
+    return data
+
+def compress_stream(source: BinaryIO, sink: BinaryIO, block_size: int = _BLOCK_SIZE) -> int:
+    """
+    Compress everything read from source into sink, one block at a time.
+
+    Each block of block_size bytes is compressed on its own with its own
+    canonical code table, so memory use depends on block_size and not on the
+    length of the stream, and the table follows changes in the data.
+
+    Parameters:
+    -----------
+    source : BinaryIO
+        A binary file or stream to read until it is exhausted.
+    sink : BinaryIO
+        A binary file or stream to write the compressed stream to.
+    block_size : int
+        The number of input bytes per block.
+
+    Returns:
+    --------
+    int
+        The number of bytes read from source.
+    """
+    assert 0 < block_size < 1 << 32, "Block size must be positive and below 4 GiB"
+    sink.write(_STREAM_MAGIC)
+    total = 0
+    for block in _blocks(source, block_size):
+        total += len(block)
+        blob = huffman_compress(block)
+        sink.write(_FRAME.pack(len(blob)))
+        sink.write(blob)
+    sink.write(_FRAME.pack(0))
+    return total
+
+def decompress_stream(source: BinaryIO, sink: BinaryIO) -> int:
+    """
+    Decompress a stream written by compress_stream into sink.
+
+    Only one block is held in memory at a time.
+
+    Returns:
+    --------
+    int
+        The number of bytes written to sink.
+    """
+    if _read_exactly(source, len(_STREAM_MAGIC)) != _STREAM_MAGIC:
+        raise ValueError("not a Huffman stream")
+    total = 0
+    while True:
+        size, = _FRAME.unpack(_read_exactly(source, _FRAME.size))
+        if size == 0:
+            return total
+        block = huffman_decompress(_read_exactly(source, size))
+        sink.write(block)
+        total += len(block)
+
+# Block containers start with the magic and the block size and hold the
+# huffman_compress blocks back to back. Then comes an index with the offset,
+# compressed size and original size of every block, and a footer with the
+# index offset, the block count and the magic again, so a reader can seek
+# straight to the index and from there to any block.
+_CONTAINER_MAGIC = b"HUFP"
+_CONTAINER_HEADER = struct.Struct(">4sI")
+_INDEX_ENTRY = struct.Struct(">QII")
+_FOOTER = struct.Struct(">QQ4s")
+
+def _map_in_order(executor: Executor, fn: Callable, items: Iterable, window: int) -> Iterator:
+    """Yield fn(item) for every item in order, with at most window calls in flight."""
+    pending: deque[Future] = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def _blocks(source: BinaryIO, block_size: int) -> Iterator[bytes]:
+    """
+    Yield consecutive blocks of block_size bytes read from source, only the last
+    one shorter. Raw streams and pipes may return less than asked for, so each
+    block is read until it is full or the stream ends.
+    """
+    while True:
+        block = source.read(block_size)
+        if not block:
+            return
+        while len(block) < block_size:
+            more = source.read(block_size - len(block))
+            if not more:
+                break
+            block += more
+        yield block
+
+def parallel_compress_stream(source: BinaryIO, sink: BinaryIO, block_size: int = _BLOCK_SIZE,
+                             workers: Optional[int] = None, executor: Optional[Executor] = None) -> int:
+    """
+    Compress source into an indexed block container, blocks in parallel.
+
+    Blocks are independent, so they are compressed on a process pool and
+    written in order. At most two blocks per worker are in flight, which
+    bounds memory however long the stream is.
+
+    Parameters:
+    -----------
+    source : BinaryIO
+        A binary file or stream to read until it is exhausted.
+    sink : BinaryIO
+        A binary file or stream to write the container to.
+    block_size : int
+        The number of input bytes per block.
+    workers : Optional[int]
+        The number of processes, by default one per CPU.
+    executor : Optional[Executor]
+        A pool to run the blocks on instead of a new one. It is left running.
+
+    Returns:
+    --------
+    int
+        The number of bytes read from source.
+    """
+    assert 0 < block_size < 1 << 32, "Block size must be positive and below 4 GiB"
+    workers = workers or os.cpu_count() or 1
+    pool = executor or ProcessPoolExecutor(workers)
+    try:
+        sink.write(_CONTAINER_HEADER.pack(_CONTAINER_MAGIC, block_size))
+        offset = _CONTAINER_HEADER.size
+        index = bytearray()
+        total = 0
+        for blob in _map_in_order(pool, huffman_compress, _blocks(source, block_size), 2 * workers):
+            length = _HEADER.unpack_from(blob)[1]
+            index += _INDEX_ENTRY.pack(offset, len(blob), length)
+            sink.write(blob)
+            offset += len(blob)
+            total += length
+        sink.write(index)
+        sink.write(_FOOTER.pack(offset, len(index) // _INDEX_ENTRY.size, _CONTAINER_MAGIC))
+        return total
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+class BlockReader:
+    """
+    Random and parallel access to a container written by parallel_compress_stream.
+
+    Attributes:
+    -----------
+    block_size : int
+        The number of original bytes per block that the container was written with.
+    index : list[tuple[int, int, int]]
+        The offset, compressed size and original size of every block.
+    size : int
+        The total number of original bytes.
+    """
+
+    def __init__(self, source: BinaryIO) -> None:
+        """
+        Read the header and the block index of a seekable container.
+
+        Parameters:
+        -----------
+        source : BinaryIO
+            A seekable binary file or stream holding the container.
+        """
+        self.source = source
+        source.seek(0)
+        magic, self.block_size = _CONTAINER_HEADER.unpack(_read_exactly(source, _CONTAINER_HEADER.size))
+        end = source.seek(0, os.SEEK_END)
+        if magic != _CONTAINER_MAGIC or end < _CONTAINER_HEADER.size + _FOOTER.size:
+            raise ValueError("not a Huffman block container")
+        source.seek(end - _FOOTER.size)
+        index_offset, count, magic = _FOOTER.unpack(_read_exactly(source, _FOOTER.size))
+        if magic != _CONTAINER_MAGIC or index_offset + count * _INDEX_ENTRY.size != end - _FOOTER.size:
+            raise ValueError("damaged Huffman block container")
+        source.seek(index_offset)
+        self.index = list(_INDEX_ENTRY.iter_unpack(_read_exactly(source, count * _INDEX_ENTRY.size)))
+        # Where each block starts in the original data, to find blocks by offset
+        self._starts: list[int] = []
+        self.size = 0
+        for entry in self.index:
+            self._starts.append(self.size)
+            self.size += entry[2]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def compressed_block(self, i: int) -> bytes:
+        """Return the huffman_compress output of block i."""
+        offset, size, _ = self.index[i]
+        self.source.seek(offset)
+        return _read_exactly(self.source, size)
+
+    def block(self, i: int) -> bytes:
+        """Decompress block i alone."""
+        return huffman_decompress(self.compressed_block(i))
+
+    def read(self, start: int, size: int) -> bytes:
+        """
+        Return size original bytes from offset start, decompressing only the blocks they span.
+        """
+        start = max(0, min(start, self.size))
+        stop = min(self.size, start + max(0, size))
+        if start == stop:
+            return b""
+        first = bisect.bisect_right(self._starts, start) - 1
+        last = bisect.bisect_right(self._starts, stop - 1) - 1
+        data = b"".join(self.block(i) for i in range(first, last + 1))
+        skip = start - self._starts[first]
+        return data[skip:skip + stop - start]
+
+    def decompress_to(self, sink: BinaryIO, workers: Optional[int] = None,
+                      executor: Optional[Executor] = None) -> int:
+        """
+        Decompress every block in parallel and write them to sink in order.
+
+        Returns:
+        --------
+        int
+            The number of bytes written to sink.
+        """
+        workers = workers or os.cpu_count() or 1
+        pool = executor or ProcessPoolExecutor(workers)
+        try:
+            total = 0
+            blobs = (self.compressed_block(i) for i in range(len(self)))
+            for block in _map_in_order(pool, huffman_decompress, blobs, 2 * workers):
+                sink.write(block)
+                total += len(block)
+            return total
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+def parallel_compress(data: bytes, block_size: int = _BLOCK_SIZE, workers: Optional[int] = None,
+                      executor: Optional[Executor] = None) -> bytes:
+    """Compress bytes into an indexed block container with parallel_compress_stream."""
+    sink = io.BytesIO()
+    parallel_compress_stream(io.BytesIO(data), sink, block_size, workers, executor)
+    return sink.getvalue()
+
+def parallel_decompress(blob: bytes, workers: Optional[int] = None, executor: Optional[Executor] = None) -> bytes:
+    """Decompress a block container held in memory, blocks in parallel."""
+    sink = io.BytesIO()
+    BlockReader(io.BytesIO(blob)).decompress_to(sink, workers, executor)
+    return sink.getvalue()
+
+# Adaptive Huffman coding (FGK). A byte seen for the first time is sent as
+# the code of the not-yet-transmitted (NYT) leaf followed by its 9-bit raw
+# value, and the raw value 256 marks the end of the data.
+_NYT = -1
+_INTERNAL = -2
+_EOF = 256
+_RAW_BITS = 9
+
+class _FGKTree:
+    """
+    The code tree of the FGK algorithm, updated after every symbol.
+
+    Nodes are integers indexing parallel lists, and the root is always 0.
+    `side` holds the bit of the branch from each node's parent. `order` lists
+    the nodes by decreasing node number, root first, and the sibling property
+    keeps their weights non-increasing along it, which makes the tree a
+    Huffman tree of the counts so far.
+
+    Attributes:
+    -----------
+    parent, left, right : list[int]
+        The parent and children of every node, -1 where there is none.
+    weight : list[int]
+        The number of symbols counted beneath every node.
+    symbol : list[int]
+        The byte of every leaf, _NYT for the escape leaf, _INTERNAL otherwise.
+    side : list[str]
+        The bit, "0" or "1", of the branch from every node's parent.
+    order : list[int]
+        The nodes by decreasing node number; position is its inverse.
+    leaves : dict[int, int]
+        The leaf of every symbol seen so far.
+    nyt : int
+        The escape leaf that new symbols are split off.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructs a tree holding only the NYT leaf, which is also the root.
+        """
+        self.parent: list[int] = [-1]
+        self.left: list[int] = [-1]
+        self.right: list[int] = [-1]
+        self.weight: list[int] = [0]
+        self.symbol: list[int] = [_NYT]
+        self.side: list[str] = [""]
+        self.order: list[int] = [0]
+        self.position: list[int] = [0]
+        self.leaves: dict[int, int] = {}
+        self.nyt = 0
+
+    def _add(self, symbol: int, parent: int, side: str) -> int:
+        """
+        Append a leaf of weight zero as the lowest-numbered node.
+
+        New leaves are only ever split off the NYT leaf, which has the lowest
+        number and weight zero, so putting them at the end of `order` keeps
+        the sibling property.
+
+        Parameters:
+        -----------
+        symbol : int
+            The byte the leaf stands for, or _NYT for the new escape leaf.
+        parent : int
+            The node the leaf hangs from.
+        side : str
+            The bit of the branch from parent, "0" or "1".
+
+        Returns:
+        --------
+        int
+            The new node.
+        """
+        node = len(self.parent)
+        self.parent.append(parent)
+        self.side.append(side)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.weight.append(0)
+        self.symbol.append(symbol)
+        self.position.append(len(self.order))
+        self.order.append(node)
+        return node
+
+    def _path(self, node: int) -> str:
+        """
+        Return the current code of a node, read from the node up to the root.
+
+        Parameters:
+        -----------
+        node : int
+            Any node of the tree.
+
+        Returns:
+        --------
+        str
+            The branch bits from the root down to node, "" for the root.
+        """
+        bits = []
+        parent, side = self.parent, self.side
+        while node:
+            bits.append(side[node])
+            node = parent[node]
+        return "".join(reversed(bits))
+
+    def code(self, symbol: int) -> str:
+        """
+        Return the bits that encode symbol in the tree's current state.
+
+        Parameters:
+        -----------
+        symbol : int
+            A byte value, or _EOF.
+
+        Returns:
+        --------
+        str
+            The code of the symbol's leaf, or, for a symbol not seen yet, the
+            code of the NYT leaf followed by the symbol in 9 raw bits.
+        """
+        leaf = self.leaves.get(symbol)
+        if leaf is None:
+            return self._path(self.nyt) + format(symbol, f"0{_RAW_BITS}b")
+        return self._path(leaf)
+
+    def _swap(self, a: int, b: int) -> None:
+        """
+        Exchange two nodes, with their subtrees, in the tree and in `order`.
+
+        This is the step that keeps the sibling property. Before a node's
+        weight goes up by one, update() swaps it with the leader of its block:
+        the highest-numbered node of the same weight. After the swap the node
+        holds the leader's place in `order`, so it is first among the nodes of
+        its old weight. Incrementing it then leaves the weights along `order`
+        non-increasing, and the tree stays a Huffman tree. The two nodes trade
+        parents and branch bits, so the codes of everything beneath them change.
+        Their subtrees move with them, and their weights are unchanged.
+
+        Parameters:
+        -----------
+        a, b : int
+            Nodes of equal weight, neither an ancestor of the other.
+        """
+        parent, left, right, order, position = self.parent, self.left, self.right, self.order, self.position
+        pa, pb = parent[a], parent[b]
+        if pa == pb:
+            left[pa], right[pa] = right[pa], left[pa]
+        else:
+            if left[pa] == a:
+                left[pa] = b
+            else:
+                right[pa] = b
+            if left[pb] == b:
+                left[pb] = a
+            else:
+                right[pb] = a
+            parent[a], parent[b] = pb, pa
+        self.side[a], self.side[b] = self.side[b], self.side[a]
+        order[position[a]], order[position[b]] = b, a
+        position[a], position[b] = position[b], position[a]
+
+    def update(self, symbol: int) -> None:
+        """
+        Count one more occurrence of symbol and restore the sibling property.
+
+        A new symbol first splits the NYT leaf into a new NYT leaf and the
+        symbol's leaf. Then every node from that leaf up to the root is moved
+        to the top of its block with _swap and its weight incremented.
+
+        Parameters:
+        -----------
+        symbol : int
+            The byte just encoded or decoded.
+        """
+        node = self.leaves.get(symbol)
+        if node is None:
+            old = self.nyt
+            node = self._add(symbol, old, "1")
+            self.nyt = self._add(_NYT, old, "0")
+            self.left[old], self.right[old] = self.nyt, node
+            self.symbol[old] = _INTERNAL
+            self.leaves[symbol] = node
+        weight, order, parent, position = self.weight, self.order, self.parent, self.position
+        while node != -1:
+            # Move the node to the top of its block of equal weights first
+            w = weight[node]
+            pos = position[node]
+            while pos and weight[order[pos - 1]] == w:
+                pos -= 1
+            leader = order[pos]
+            if leader != node and leader != parent[node]:
+                self._swap(node, leader)
+            weight[node] = w + 1
+            node = parent[node]
+
+class AdaptiveHuffmanEncoder:
+    """
+    Single-pass adaptive Huffman encoder for byte streams.
+
+    The code of each byte depends only on the bytes before it, so no
+    frequency pass and no code table are needed, and output can be sent as
+    soon as it is produced.
+
+    >>> encoder = AdaptiveHuffmanEncoder()
+    >>> blob = encoder.feed(b"abra") + encoder.feed(b"cadabra") + encoder.flush()
+    >>> adaptive_decompress(blob)
+    b'abracadabra'
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructs an encoder whose tree has seen no symbols yet.
+        """
+        self.tree = _FGKTree()
+        self._pending = ""
+        self.closed = False
+
+    def _pack(self, parts: list[str]) -> bytes:
+        """
+        Pack the whole bytes of some code text and keep the leftover bits.
+
+        Parameters:
+        -----------
+        parts : list[str]
+            The pending bits followed by the new codes, as '0'/'1' text.
+
+        Returns:
+        --------
+        bytes
+            The complete bytes; fewer than eight bits stay pending.
+        """
+        bits = "".join(parts)
+        whole = len(bits) - len(bits) % 8
+        self._pending = bits[whole:]
+        return int(bits[:whole], 2).to_bytes(whole // 8, "big") if whole else b""
+
+    def feed(self, data: bytes) -> bytes:
+        """
+        Encode data, updating the tree after every byte.
+
+        Parameters:
+        -----------
+        data : bytes
+            The next piece of input, of any length.
+
+        Returns:
+        --------
+        bytes
+            The output bytes completed so far. Up to seven bits wait for the
+            next call or for flush().
+        """
+        assert not self.closed, "feed() after flush()"
+        code, update = self.tree.code, self.tree.update
+        parts = [self._pending]
+        for symbol in data:
+            parts.append(code(symbol))
+            update(symbol)
+        return self._pack(parts)
+
+    def flush(self) -> bytes:
+        """
+        End the stream with the EOF marker. The encoder cannot be fed afterwards.
+
+        Returns:
+        --------
+        bytes
+            The rest of the output, with the last byte padded with zero bits.
+        """
+        assert not self.closed, "flush() called twice"
+        self.closed = True
+        out = self._pack([self._pending, self.tree.code(_EOF)])
+        if self._pending:
+            out += int(self._pending.ljust(8, "0"), 2).to_bytes(1, "big")
+            self._pending = ""
+        return out
+
+class AdaptiveHuffmanDecoder:
+    """
+    Decoder for the output of AdaptiveHuffmanEncoder, fed in pieces of any size.
+
+    Attributes:
+    -----------
+    finished : bool
+        True once the end marker has been read. Any later input is ignored.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructs a decoder whose tree has seen no symbols yet.
+        """
+        self.tree = _FGKTree()
+        self.finished = False
+        self._node = 0
+        # An empty tree is all NYT, so the stream starts with a raw value
+        self._raw = 0
+        self._raw_left = _RAW_BITS
+
+    def feed(self, data: bytes) -> bytes:
+        """
+        Decode data, updating the tree after every byte exactly as the encoder did.
+
+        A code may be split across calls; the position in the tree and any
+        partly read raw value are kept until the next call.
+
+        Parameters:
+        -----------
+        data : bytes
+            The next piece of the encoded stream, of any length.
+
+        Returns:
+        --------
+        bytes
+            The bytes whose codes were completed by data.
+        """
+        out = bytearray()
+        if self.finished or not data:
+            return bytes(out)
+        tree = self.tree
+        left, right, symbols = tree.left, tree.right, tree.symbol
+        node, raw, raw_left = self._node, self._raw, self._raw_left
+        for bit in format(int.from_bytes(data, "big"), f"0{len(data) * 8}b"):
+            if raw_left:
+                raw = 2 * raw + (bit == "1")
+                raw_left -= 1
+                if raw_left:
+                    continue
+                symbol = raw
+            else:
+                node = left[node] if bit == "0" else right[node]
+                symbol = symbols[node]
+                if symbol == _INTERNAL:
+                    continue
+                if symbol == _NYT:
+                    raw, raw_left = 0, _RAW_BITS
+                    continue
+            if symbol == _EOF:
+                self.finished = True
+                break
+            out.append(symbol)
+            tree.update(symbol)
+            node = 0
+        self._node, self._raw, self._raw_left = node, raw, raw_left
+        return bytes(out)
+
+    def flush(self) -> None:
+        """
+        Check that the stream is complete, raising ValueError if the end marker
+        has not been read.
+        """
+        if not self.finished:
+            raise ValueError("truncated adaptive Huffman data")
+
+def adaptive_compress(data: bytes) -> bytes:
+    """
+    Encode bytes in one pass with adaptive Huffman coding.
+
+    >>> adaptive_decompress(adaptive_compress(b"mississippi"))
+    b'mississippi'
+    """
+    encoder = AdaptiveHuffmanEncoder()
+    return encoder.feed(data) + encoder.flush()
+
+def adaptive_decompress(blob: bytes) -> bytes:
+    """Decode the output of adaptive_compress or AdaptiveHuffmanEncoder."""
+    decoder = AdaptiveHuffmanDecoder()
+    out = decoder.feed(blob)
+    decoder.flush()
+    return out
+
+# Dictionaries are the magic and the code lengths of the 256 byte values and
+# the escape symbol, 0 for bytes left out. A byte without a code of its own is
+# encoded as the escape code followed by its 8 raw bits.
+_DICTIONARY_MAGIC = b"HUFD"
+_ESCAPE = 256
+
+def _varint(n: int) -> bytes:
+    """
+    Encode n in 7-bit groups, least significant first, with the top bit set on all but the last.
+
+    >>> _varint(5), _varint(300)
+    (b'\\x05', b'\\xac\\x02')
+    """
+    out = bytearray()
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+def _read_varint(blob: bytes) -> tuple[int, int]:
+    """Return the number at the start of blob written by _varint and the offset after it."""
+    n = shift = 0
+    for offset, byte in enumerate(blob):
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, offset + 1
+        shift += 7
+    raise ValueError("truncated Huffman message")
+
+class HuffmanDictionary:
+    """
+    A code table trained once on sample data and shared by many small messages.
+
+    Every message is encoded with the same canonical codes, so nothing is
+    built or sent per message: an encoded message is its length as a varint
+    followed by the packed codes. Bytes that did not occur in training are
+    sent as an escape code and their raw value.
+
+    Attributes:
+    -----------
+    lengths : dict[int, int]
+        The code length of every trained byte value and of the escape symbol.
+
+    >>> dictionary = HuffmanDictionary.train([b"the cat sat on the mat"])
+    >>> message = dictionary.encode(b"the bat")
+    >>> len(message), dictionary.decode(message)
+    (5, b'the bat')
+    """
+
+    def __init__(self, lengths: dict[int, int]) -> None:
+        """
+        Build the encoding and decoding tables once for a set of code lengths.
+
+        Parameters:
+        -----------
+        lengths : dict[int, int]
+            Code lengths of byte values and of the escape symbol 256.
+        """
+        assert _ESCAPE in lengths, "Dictionary has no escape code"
+        self.lengths = lengths
+        codes = canonical_codes(lengths)
+        escape = codes.pop(_ESCAPE)
+        self.codes = {symbol: codes.get(symbol) or escape + format(symbol, "08b") for symbol in range(256)}
+        self._table = [self.codes[symbol] for symbol in range(256)]
+        self._emit, self._follow = build_decode_table(self.codes)
+
+    @classmethod
+    def train(cls, samples: Iterable[bytes]) -> "HuffmanDictionary":
+        """Build a dictionary from the byte frequencies of sample messages."""
+        counts: Counter = Counter()
+        for sample in samples:
+            counts.update(sample)
+        counts[_ESCAPE] = 1
+        return cls(code_lengths(build_huffman_tree(dict(sorted(counts.items())))))
+
+    def serialize(self) -> bytes:
+        """Return the dictionary as 261 bytes, to be stored or shipped once."""
+        return _DICTIONARY_MAGIC + bytes(self.lengths.get(symbol, 0) for symbol in range(257))
+
+    @classmethod
+    def deserialize(cls, blob: bytes) -> "HuffmanDictionary":
+        """Rebuild a dictionary from the output of serialize."""
+        if len(blob) != 261 or blob[:4] != _DICTIONARY_MAGIC or not blob[4 + _ESCAPE]:
+            raise ValueError("not a Huffman dictionary")
+        lengths = {symbol: bits for symbol, bits in enumerate(blob[4:]) if bits}
+        longest = max(lengths.values())
+        if sum(1 << (longest - bits) for bits in lengths.values()) > 1 << longest:
+            raise ValueError("invalid Huffman code lengths")
+        return cls(lengths)
+
+    def encode(self, message: bytes) -> bytes:
+        """Encode one message with the trained codes."""
+        return _varint(len(message)) + _pack_table(message, self._table)
+
+    def decode(self, blob: bytes) -> bytes:
+        """Decode one message written by encode."""
+        length, offset = _read_varint(blob)
+        if length == 0:
+            return b""
+        return _decode_table(memoryview(blob)[offset:], self._emit, self._follow, length)
 
 def randomString(n: int) -> str:
     # https://stackoverflow.com/questions/2257441/random-string-generation-with-upper-case-letters-and-digits
@@ -258,6 +1366,204 @@ def test():
     rm, rmtree = huffman_encoding(randMillion)
     assert huffman_decoding(rm, rmtree) == randMillion
 
+    # Byte codec: packed bits and a self-describing header
+    assert huffman_decompress(huffman_compress(b"")) == b""
+    assert huffman_decompress(huffman_compress(b"a")) == b"a"
+    assert huffman_decompress(huffman_compress(b"A" * 1000)) == b"A" * 1000
+    everything = bytes(range(256)) * 3
+    assert huffman_decompress(huffman_compress(everything)) == everything
+    packed = huffman_compress(randMillion.encode())
+    assert len(packed) < 1_000_000 * 5 // 8 + 200
+    assert huffman_decompress(packed) == randMillion.encode()
+    # Fibonacci frequencies give codes longer than a byte
+    fib, a, b = bytearray(), 1, 1
+    for symbol in range(20):
+        fib += bytes([symbol]) * a
+        a, b = b, a + b
+    codes: dict[int, str] = {}
+    generate_huffman_codes(build_huffman_tree(byte_frequencies(bytes(fib))), "", codes)
+    assert max(len(code) for code in codes.values()) > 8
+    assert huffman_decompress(huffman_compress(bytes(fib))) == fib
+    # Canonical codes keep the tree's code lengths and stay prefix-free, and
+    # the header holds lengths only
+    lengths = code_lengths(build_huffman_tree(byte_frequencies(everything + b"abc" * 99)))
+    canonical = canonical_codes(lengths)
+    assert {s: len(c) for s, c in canonical.items()} == lengths
+    ordered = sorted(canonical.values())
+    assert not any(b.startswith(a) for a, b in zip(ordered, ordered[1:]))
+    assert len(huffman_compress(everything)) - len(pack_bits(everything, canonical_codes(
+        code_lengths(build_huffman_tree(byte_frequencies(everything)))))) == 14 + 256
+    assert len(huffman_compress(b"abbccc")) == 14 + 3 * 2 + 2
+    assert huffman_compress(b"abbccc")[:20] == huffman_compress(b"cbcacb")[:20]
+    # Short payloads walk the tree and long ones use a cached table; both
+    # decode and reject the same inputs
+    for sample in (b"a", b"abbccc", bytes(fib), everything, randMillion.encode()[:50_000]):
+        lengths, length, offset = deserialize_code_lengths(huffman_compress(sample))
+        payload = huffman_compress(sample)[offset:]
+        sample_codes = canonical_codes(lengths)
+        tables = build_decode_table(sample_codes)
+        for trimmed in (payload, payload[:-1], payload[:-1] + b"\xff"):
+            results = []
+            for decode in (lambda: _decode_walk(trimmed, sample_codes, length),
+                           lambda: _decode_table(trimmed, *tables, length)):
+                try:
+                    results.append(decode())
+                except ValueError as error:
+                    results.append(str(error))
+            assert results[0] == results[1], results
+        assert _decode_walk(payload, sample_codes, length) == sample
+    _DECODE_CACHE.clear()
+    assert huffman_decompress(huffman_compress(b"short")) == b"short" and not _DECODE_CACHE
+    assert huffman_decompress(packed) == randMillion.encode() and len(_DECODE_CACHE) == 1
+
+    # Streams: every block has its own table and the last frame is empty
+    for size in (0, 1, 999, 1000, 1001, 25_000):
+        source = randMillion.encode()[:size // 2] + bytes(range(256)) * (size // 512)
+        compressed = io.BytesIO()
+        assert compress_stream(io.BytesIO(source), compressed, block_size=1000) == len(source)
+        restored = io.BytesIO()
+        compressed.seek(0)
+        assert decompress_stream(compressed, restored) == len(source)
+        assert restored.getvalue() == source
+    assert compressed.getvalue()[:4] == b"HUFS" and compressed.getvalue()[-4:] == bytes(4)
+    try:
+        compress_stream(io.BytesIO(b"abc"), io.BytesIO(), block_size=0)
+    except AssertionError as err:
+        assert str(err) == "Block size must be positive and below 4 GiB"
+    else:
+        assert False
+    for corrupt in (b"", b"HUFX" + bytes(4), compressed.getvalue()[:-1], compressed.getvalue()[:5000]):
+        try:
+            decompress_stream(io.BytesIO(corrupt), io.BytesIO())
+        except ValueError:
+            pass
+        else:
+            assert False, corrupt[:10]
+
+    # The NumPy path counts exactly like the pure Python one
+    if np is not None:
+        for sample in (b"", b"a", bytes(fib), everything, randMillion.encode()[:100_000] + bytes(range(7))):
+            assert _numpy_byte_frequencies(sample) == _python_byte_frequencies(sample)
+
+    # Adaptive coding: any split of the input or output gives the same bytes
+    source = randMillion.encode()[:20_000] + bytes(range(256)) + bytes(fib)[:5000]
+    encoder = AdaptiveHuffmanEncoder()
+    pieces = [encoder.feed(source[i:i + 777]) for i in range(0, len(source), 777)] + [encoder.flush()]
+    stream = b"".join(pieces)
+    assert stream == adaptive_compress(source)
+    weights = [encoder.tree.weight[node] for node in encoder.tree.order]
+    assert weights == sorted(weights, reverse=True) and weights[0] == len(source)
+    decoder = AdaptiveHuffmanDecoder()
+    assert b"".join(decoder.feed(stream[i:i + 13]) for i in range(0, len(stream), 13)) == source
+    decoder.flush()
+    assert decoder.finished and decoder.feed(b"ignored") == b""
+    assert adaptive_decompress(adaptive_compress(b"")) == b""
+    assert adaptive_decompress(adaptive_compress(b"a" * 1000)) == b"a" * 1000
+    assert len(adaptive_compress(randMillion.encode()[:100_000])) < 100_000 * 5 // 8
+    try:
+        adaptive_decompress(stream[:-2])
+    except ValueError:
+        pass
+    else:
+        assert False
+
+    # Trained dictionaries: no per-message table, and escapes for unseen bytes
+    training = [randMillion[i:i + 50].encode() for i in range(0, 100_000, 50)]
+    dictionary = HuffmanDictionary.train(training)
+    assert set(dictionary.lengths) == set(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ") | {_ESCAPE}
+    for message in (b"", b"A", b"HELLO", b"hello, world", bytes(range(256)), randMillion[-1000:].encode()):
+        encoded = dictionary.encode(message)
+        assert dictionary.decode(encoded) == message
+    # Known bytes cost only their code: no header and no escapes
+    bits = sum(dictionary.lengths[byte] for byte in b"HUFFMAN" * 10)
+    assert len(dictionary.encode(b"HUFFMAN" * 10)) == 1 + (bits + 7) // 8
+    try:
+        HuffmanDictionary({97: 1, 98: 1})
+    except AssertionError as err:
+        assert str(err) == "Dictionary has no escape code"
+    else:
+        assert False
+    shipped = HuffmanDictionary.deserialize(dictionary.serialize())
+    assert shipped.codes == dictionary.codes and len(dictionary.serialize()) == 261
+    assert shipped.decode(dictionary.encode(b"SHIPPED!")) == b"SHIPPED!"
+    for corrupt in (b"", dictionary.serialize()[:-1], b"HUFD" + bytes(257), b"HUFD" + bytes([1] * 257)):
+        try:
+            HuffmanDictionary.deserialize(corrupt)
+        except ValueError:
+            pass
+        else:
+            assert False, corrupt[:10]
+    for corrupt in (b"", b"\x80", dictionary.encode(b"TRUNCATED")[:-2]):
+        try:
+            dictionary.decode(corrupt)
+        except ValueError:
+            pass
+        else:
+            assert False, corrupt
+
+    # Block containers, compressed and decompressed on one shared process pool
+    source = randMillion.encode()[:30_000] + bytes(range(256)) * 40
+    with ProcessPoolExecutor(2) as pool:
+        container = parallel_compress(source, block_size=4096, executor=pool)
+        assert parallel_decompress(container, executor=pool) == source
+        assert parallel_decompress(parallel_compress(b"", executor=pool), executor=pool) == b""
+    reader = BlockReader(io.BytesIO(container))
+    assert len(reader) == 10 and reader.size == len(source) and reader.block_size == 4096
+    assert reader.block(9) == source[9 * 4096:]
+    for start, size in ((0, 1), (4095, 2), (5000, 20_000), (40_000, 10), (len(source) - 1, 99), (10**6, 5)):
+        assert reader.read(start, size) == source[start:start + size]
+    assert parallel_decompress(parallel_compress(b"abc", workers=1), workers=1) == b"abc"
+
+    class Trickle(io.RawIOBase):
+        """A raw stream that returns at most 1000 bytes per read, like a pipe."""
+        def __init__(self, data: bytes) -> None:
+            self.data = io.BytesIO(data)
+
+        def readable(self) -> bool:
+            return True
+
+        def readinto(self, buffer) -> int:
+            chunk = self.data.read(min(len(buffer), 1000))
+            buffer[:len(chunk)] = chunk
+            return len(chunk)
+
+    # Short reads still fill every block but the last
+    sink = io.BytesIO()
+    assert parallel_compress_stream(Trickle(source), sink, 4096, workers=1) == len(source)
+    assert sink.getvalue() == container
+    trickled, whole = io.BytesIO(), io.BytesIO()
+    compress_stream(Trickle(source), trickled, 4096)
+    compress_stream(io.BytesIO(source), whole, 4096)
+    assert trickled.getvalue() == whole.getvalue()
+    # A container whose blocks differ in size is still read at the right offsets
+    pieces = [source[:100], source[100:5000], source[5000:5050], source[5050:]]
+    blobs = [huffman_compress(piece) for piece in pieces]
+    offsets = [_CONTAINER_HEADER.size + sum(map(len, blobs[:i])) for i in range(len(blobs))]
+    index = b"".join(_INDEX_ENTRY.pack(o, len(b), len(p)) for o, b, p in zip(offsets, blobs, pieces))
+    uneven = BlockReader(io.BytesIO(_CONTAINER_HEADER.pack(_CONTAINER_MAGIC, 4096) + b"".join(blobs) + index
+                                    + _FOOTER.pack(offsets[-1] + len(blobs[-1]), len(blobs), _CONTAINER_MAGIC)))
+    for start, size in ((0, 1), (99, 2), (4999, 60), (5049, 2), (5050, 10_000), (3000, 40_000)):
+        assert uneven.read(start, size) == source[start:start + size]
+    for corrupt in (b"", b"HUFX" + container[4:], container[:-1], container[:100]):
+        try:
+            BlockReader(io.BytesIO(corrupt))
+        except ValueError:
+            pass
+        else:
+            assert False, corrupt[:10]
+
+    # One symbol has only the code '0', so a set bit is not a valid code
+    invalid = serialize_code_lengths({97: 1}, 3) + b"\x10"
+    # Three one-bit codes break Kraft's inequality
+    oversubscribed = serialize_code_lengths({97: 1, 98: 1, 99: 1}, 3) + b"\x00"
+    for corrupt in (b"", b"XXXX" + packed[4:], packed[:20], packed[:-1], invalid, oversubscribed):
+        try:
+            huffman_decompress(corrupt)
+        except ValueError:
+            pass
+        else:
+            assert False, corrupt
+
 
 # Main Function
 if __name__ == "__main__":
@@ -1,17 +1,35 @@
+from typing import Iterator
+
+
 class Group:
     """
     A class to represent a group which can contain sub-groups and users.
 
+    Every group also keeps the set of all users in it or in any group below
+    it, kept up to date by add_user and add_group, so membership checks do
+    not search the sub-groups. Groups and users must be added through those
+    methods for the index to stay correct.
+
+    Sub-groups and users are kept in sets, so adding one twice has no effect
+    and a direct membership test is O(1), and __slots__ keeps each of the
+    thousands of groups in an org tree free of an instance dictionary.
+
     Attributes:
     -----------
     name : str
         The name of the group.
-    groups : list[Group]
-        A list of sub-groups within this group.
-    users : list[str]
-        A list of users in this group.
+    groups : set[Group]
+        The sub-groups within this group.
+    users : set[str]
+        The users in this group.
+    parents : set[Group]
+        The groups this group was added to.
+    all_users : set[str]
+        Every user in this group or in any of its sub-groups, at any depth.
     """
 
+    __slots__ = ("name", "groups", "users", "parents", "all_users")
+
     def __init__(self, _name: str) -> None:
         """
         Constructs all the necessary attributes for the Group object.
@@ -22,8 +40,25 @@ class Group:
             The name of the group.
         """
         self.name: str = _name
-        self.groups: list[Group] = []
-        self.users: list[str] = []
+        self.groups: set[Group] = set()
+        self.users: set[str] = set()
+        self.parents: set[Group] = set()
+        self.all_users: set[str] = set()
+
+    def _propagate(self, users: set[str]) -> None:
+        """
+        Add users to the index of this group and of every group above it.
+
+        A group that already has all of them passes nothing up, since its
+        ancestors have them too, which also ends the walk around a cycle.
+        """
+        stack = [(self, users)]
+        while stack:
+            group, pending = stack.pop()
+            new = pending - group.all_users
+            if new:
+                group.all_users |= new
+                stack.extend((parent, new) for parent in group.parents)
 
     def add_group(self, group: 'Group') -> None:
         """
@@ -34,7 +69,9 @@ class Group:
         group : Group
             The sub-group to be added.
         """
-        self.groups.append(group)
+        self.groups.add(group)
+        group.parents.add(self)
+        self._propagate(group.all_users)
 
     def add_user(self, user: str) -> None:
         """
@@ -45,27 +82,28 @@ class Group:
         user : str
             The user to be added.
         """
-        self.users.append(user)
+        self.users.add(user)
+        self._propagate({user})
 
-    def get_groups(self) -> list['Group']:
+    def get_groups(self) -> set['Group']:
         """
-        Get the list of sub-groups in this group.
+        Get the sub-groups in this group.
 
         Returns:
         --------
-        list[Group]
-            A list of sub-groups.
+        set[Group]
+            The set of sub-groups.
         """
         return self.groups
 
-    def get_users(self) -> list[str]:
+    def get_users(self) -> set[str]:
         """
-        Get the list of users in this group.
+        Get the users in this group.
 
         Returns:
         --------
-        list[str]
-            A list of users.
+        set[str]
+            The set of users.
         """
         return self.users
 
@@ -85,6 +123,9 @@ def is_user_in_group(user: str, group: Group) -> bool:
     """
     Check if a user is in the given group or any of its sub-groups.
 
+    This is a set lookup in the group's index of all users below it, O(1)
+    whatever the depth and size of the hierarchy.
+
     Parameters:
     -----------
     user : str
@@ -103,19 +144,59 @@ def is_user_in_group(user: str, group: Group) -> bool:
     if group is None:
         return False
 
-    # Use a stack to implement an iterative depth-first search
-    stack = [group]
+    return user in group.all_users
+
+
+def iter_groups(group: Group) -> Iterator[Group]:
+    """
+    Yield group and every group below it, each exactly once.
+
+    A visited set means a group reachable along several paths, as in a
+    diamond, is expanded only once, and a cycle ends instead of looping.
 
+    Parameters:
+    -----------
+    group : Group
+        The group to start from.
+
+    Returns:
+    --------
+    Iterator[Group]
+        The groups, starting with group itself.
+    """
+    seen = {group}
+    stack = [group]
     while stack:
         current_group = stack.pop()
-        # Check if the user is directly in this group
-        if user in current_group.get_users():
-            return True
+        yield current_group
+        for sub_group in current_group.get_groups():
+            if sub_group not in seen:
+                seen.add(sub_group)
+                stack.append(sub_group)
+
+
+def users_in_group(group: Group) -> set[str]:
+    """
+    Return every user in the given group or any of its sub-groups, in one pass.
+
+    It reads each group's own users once, O(groups + memberships) below the
+    group, for bulk exports. It does not rely on the membership index, so
+    it also serves as a check on it.
+
+    Parameters:
+    -----------
+    group : Group
+        The group whose effective members are wanted.
 
-        # Add all subgroups to the stack for further exploration
-        stack.extend(current_group.get_groups())
+    Returns:
+    --------
+    set[str]
+        The users, each once.
+    """
+    if group is None:
+        return set()
+    return set().union(*(current_group.get_users() for current_group in iter_groups(group)))
 
-    return False
 
 if __name__ == "__main__":
     # Testing the implementation
@@ -141,3 +222,57 @@ if __name__ == "__main__":
 
     # Test Case 3
     assert is_user_in_group("nope", parent) == False
+
+    # The index follows users and groups added in any order
+    assert parent.all_users == child.all_users == {"sub_child_user"}
+    sub_child.add_user("late_user")
+    assert is_user_in_group("late_user", parent)
+    other = Group("other")
+    other.add_user("other_user")
+    leaf = Group("leaf")
+    leaf.add_user("leaf_user")
+    other.add_group(leaf)
+    sub_child.add_group(other)
+    assert is_user_in_group("leaf_user", parent) and is_user_in_group("other_user", child)
+    assert not is_user_in_group("leaf_user", Group("unrelated"))
+    assert not is_user_in_group("parent_user", child)
+    parent.add_user("parent_user")
+    assert is_user_in_group("parent_user", parent) and not is_user_in_group("parent_user", child)
+
+    # A group shared by two parents, and a cycle, are indexed once and end
+    shared = Group("shared")
+    left, right = Group("left"), Group("right")
+    left.add_group(shared)
+    right.add_group(shared)
+    shared.add_user("shared_user")
+    assert is_user_in_group("shared_user", left) and is_user_in_group("shared_user", right)
+    loop_a, loop_b = Group("a"), Group("b")
+    loop_a.add_user("a_user")
+    loop_a.add_group(loop_b)
+    loop_b.add_group(loop_a)
+    loop_b.add_user("b_user")
+    assert loop_a.all_users == loop_b.all_users == {"a_user", "b_user"}
+
+    # Batch export visits every group once, through diamonds and cycles
+    assert users_in_group(loop_a) == users_in_group(loop_b) == {"a_user", "b_user"}
+    assert list(iter_groups(loop_a)) == [loop_a, loop_b]
+    assert users_in_group(parent) == parent.all_users
+    assert users_in_group(None) == set()
+    top = bottom = Group("layer0")
+    for depth in range(1, 60):
+        left, right = Group(f"left{depth}"), Group(f"right{depth}")
+        left.add_group(bottom)
+        right.add_group(bottom)
+        bottom = Group(f"layer{depth}")
+        bottom.add_group(left)
+        bottom.add_group(right)
+    top.add_user("deep_user")
+    # 2**59 paths lead from the top layer to the user, but only 178 groups
+    assert users_in_group(bottom) == {"deep_user"} and len(list(iter_groups(bottom))) == 178
+    assert is_user_in_group("deep_user", bottom)
+
+    # Sets ignore repeats, and __slots__ leaves no instance dictionary
+    parent.add_user("parent_user")
+    child.add_group(sub_child)
+    assert sorted(parent.get_users()) == ["parent_user"] and len(child.get_groups()) == 1
+    assert not hasattr(parent, "__dict__")